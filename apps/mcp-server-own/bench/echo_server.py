@@ -0,0 +1,48 @@
+"""Local HTTP echo server used as the rest_call target in benchmarks.
+
+Responds to any GET/POST with a small JSON body describing the request,
+after ECHO_DELAY_MS of simulated latency.
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DELAY_MS = float(os.getenv("ECHO_DELAY_MS", "2"))
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8", "replace") if length else ""
+        time.sleep(DELAY_MS / 1000.0)
+        payload = json.dumps({"method": self.command, "path": self.path, "body": body}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_echo_server(host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the echo server on a daemon thread; returns the server (see .server_address)"""
+    server = ThreadingHTTPServer((host, port), EchoHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    srv = start_echo_server(port=int(os.getenv("ECHO_PORT", "8099")))
+    print(f"Echo server on http://{srv.server_address[0]}:{srv.server_address[1]}")
+    threading.Event().wait()
@@ -0,0 +1,117 @@
+"""Fake DB-API 2.0 driver for benchmarks.
+
+install() registers this module as `psycopg2` and `vertica_python` so the
+gateway's SQL tools run against it instead of a real database. Every
+execute() sleeps FAKE_DB_LATENCY_MS and produces FAKE_DB_ROWS rows of
+(id, name, value).
+"""
+
+import os
+import sys
+import time
+import types
+
+LATENCY_MS = float(os.getenv("FAKE_DB_LATENCY_MS", "5"))
+ROWS = int(os.getenv("FAKE_DB_ROWS", "100"))
+
+IS_FAKE_DB = True  # marks the installed aliases
+
+apilevel = "2.0"
+paramstyle = "pyformat"
+
+
+class Error(Exception):
+    pass
+
+
+class OperationalError(Error):
+    pass
+
+
+class InterfaceError(Error):
+    pass
+
+
+class Cursor:
+    def __init__(self, connection, name=None):
+        self.connection = connection
+        self.name = name
+        self.itersize = 2000
+        self.description = None
+        self.rowcount = -1
+        self._rows = []
+        self._pos = 0
+
+    def execute(self, sql, params=None):
+        if self.connection.closed:
+            raise OperationalError("connection closed")
+        time.sleep(LATENCY_MS / 1000.0)
+        self.description = [("id",) + (None,) * 6, ("name",) + (None,) * 6, ("value",) + (None,) * 6]
+        self._rows = [(i, f"row{i}", i * 1.5) for i in range(ROWS)]
+        self._pos = 0
+        self.rowcount = len(self._rows)
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size=100):
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(len(self._rows))
+
+    def close(self):
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Connection:
+    def __init__(self):
+        self.closed = False
+
+    def cursor(self, name=None):
+        return Cursor(self, name)
+
+    def cancel(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def connect(*args, **kwargs):
+    return Connection()
+
+
+def install():
+    """Register this module as the psycopg2 / vertica_python drivers (idempotent)"""
+    if getattr(sys.modules.get("psycopg2"), "IS_FAKE_DB", False):
+        return
+    if "core.db" in sys.modules:
+        # core.db binds the drivers at import time; installing now would silently do nothing
+        raise RuntimeError("fake_db.install() must run before core.db is imported")
+    module = sys.modules[__name__]
+    for name in ("psycopg2", "vertica_python"):
+        alias = types.ModuleType(name)
+        alias.__dict__.update({k: v for k, v in module.__dict__.items() if not k.startswith("__")})
+        sys.modules[name] = alias
@@ -0,0 +1,57 @@
+"""Exercise fleet mode against several local gateway instances.
+
+Starts --instances gateways in-process on free ports, adds one unreachable
+peer, runs a FleetAggregator over them for --rounds poll rounds and prints
+the fleet-wide disk ranking plus per-peer poll stats.
+
+Example:
+    python bench/fleet_local.py --instances 5 --rounds 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from run_bench import start_local_gateway  # noqa: E402
+
+
+def unused_url() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+async def run(peers, rounds: int, timeout: float) -> None:
+    from core.fleet import FleetAggregator
+
+    fleet = FleetAggregator(peers, interval=1.0, timeout=timeout)
+    try:
+        for _ in range(rounds):
+            await fleet.poll_all()
+        print(json.dumps(fleet.query("disk", top_n=len(peers)), indent=2))
+        print(json.dumps(fleet.stats(), indent=2))
+    finally:
+        await fleet.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    os.environ.pop("FLEET_PEERS", None)  # the local instances are plain peers
+    peers = [start_local_gateway() for _ in range(args.instances)] + [unused_url()]
+    asyncio.run(run(peers, args.rounds, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Load-test / latency benchmark for mcp-server-own.
+
+Drives /mcp/query, /mcp JSON-RPC (single and batch) and the direct
+/mcp/{tool_name} route at a fixed concurrency and reports throughput and
+p50/p95/p99 latency per scenario.
+
+By default the gateway is started in-process (uvicorn on a free port) with
+the fake DB driver installed and rest_call pointed at a local echo server,
+so runs are reproducible without external services. Use --target to
+benchmark an already running gateway instead.
+
+Requests are made distinct per scenario by default (a counter in the prompt
+or arguments), so identical-call coalescing does not hide tool latency;
+--no-unique sends the same request every time to measure coalescing. The
+osname and diskusage scenarios take no varying argument and are always
+identical.
+
+A request counts as an error on an HTTP error status, a JSON-RPC error
+member, or a tool result that carries an "error" key.
+
+Examples:
+    python bench/run_bench.py --concurrency 16 --requests 500
+    python bench/run_bench.py --save-baseline bench/baseline.json
+    python bench/run_bench.py --baseline bench/baseline.json --tolerance 0.15
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+
+def build_scenarios(echo_url: str) -> Dict[str, Callable[[int], Dict[str, Any]]]:
+    """Scenario name -> function(i) returning request kwargs (method, path, json/params).
+
+    i is a per-request counter that makes every request distinct (0 for
+    every request with --no-unique).
+    """
+    def query(prompt: str):
+        return lambda i: {"method": "POST", "path": "/mcp/query", "json": {"prompt": prompt.format(i=i)}}
+
+    def rpc_call(prompt: str, rpc_id: Any) -> Dict[str, Any]:
+        return {
+            "jsonrpc": "2.0", "id": rpc_id, "method": "tools/call",
+            "params": {"name": "gateway", "arguments": {"prompt": prompt}},
+        }
+
+    return {
+        "query_hello": query("@hello bench{i}"),
+        "query_osname": query("@osname"),
+        "query_diskusage": query("@diskusage /"),
+        "query_psql": query("@psql SELECT id, name FROM bench WHERE id > {i}"),
+        "query_vertica": query("@vertica SELECT id, name FROM bench WHERE id > {i}"),
+        "query_rest": query("@rest " + echo_url + "/item/{i}"),
+        "rpc_single": lambda i: {
+            "method": "POST", "path": "/mcp", "json": rpc_call(f"@hello rpc{i}", i),
+        },
+        "rpc_batch": lambda i: {
+            "method": "POST", "path": "/mcp",
+            "json": [rpc_call(f"@hello batch{i}-{n}", f"{i}-{n}") for n in range(5)],
+        },
+        "direct_osname": lambda i: {"method": "GET", "path": "/mcp/get_os_name"},
+        "direct_hello": lambda i: {"method": "GET", "path": "/mcp/hello", "params": {"message": f"direct{i}"}},
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _tool_failed(result: Any) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+
+def response_ok(resp: requests.Response) -> bool:
+    """Whether a gateway response is a success (HTTP status, JSON-RPC and tool level)"""
+    if resp.status_code >= 400:
+        return False
+    if resp.status_code == 202 and not resp.content:
+        return True
+    try:
+        body = resp.json()
+    except ValueError:
+        return False
+    messages = body if isinstance(body, list) else [body]
+    for message in messages:
+        if not isinstance(message, dict):
+            return False
+        if "jsonrpc" in message:
+            if "error" in message:
+                return False
+            result = message.get("result") or {}
+            if result.get("isError") or _tool_failed(result.get("structuredContent")):
+                return False
+        elif _tool_failed(message.get("result")):
+            return False
+    return True
+
+
+def run_scenario(base_url: str, make_request: Callable[[int], Dict[str, Any]], total: int,
+                 concurrency: int, unique: bool, timeout: float) -> Dict[str, Any]:
+    local = threading.local()
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal errors
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        kwargs = make_request(i if unique else 0)
+        method, path = kwargs.pop("method"), kwargs.pop("path")
+        started = time.perf_counter()
+        try:
+            resp = session.request(method, base_url + path, timeout=timeout, **kwargs)
+            ok = response_ok(resp)
+        except requests.RequestException:
+            ok = False
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            errors += not ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """Return regression messages (p95 slower or rps lower by more than tolerance)"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if base["rps"] and current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {base['rps']} -> {current['rps']}")
+    return regressions
+
+
+def start_local_gateway() -> str:
+    """Start the gateway in-process on a free port (fake DB driver installed)"""
+    import fake_db
+    fake_db.install()
+    os.environ.setdefault("POSTGRES_DSN", "postgresql://bench@fake-postgres/bench")
+    os.environ.setdefault("VERTICA_DSN", "vertica://bench@fake-vertica/bench")
+
+    import uvicorn
+    from api.main import app
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 15
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("Gateway did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def print_table(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]]) -> None:
+    header = f"{'scenario':<18}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = f"{name:<18}{r['rps']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}"
+        base = (baseline or {}).get(name)
+        if base and base["p95_ms"]:
+            line += f"   p95 {100.0 * (r['p95_ms'] / base['p95_ms'] - 1):+.0f}% vs baseline"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="mcp-server-own load test")
+    parser.add_argument("--target", help="Base URL of a running gateway (default: start one in-process)")
+    parser.add_argument("--echo-url", help="rest_call target (default: start a local echo server)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario")
+    parser.add_argument("--scenarios", help="Comma-separated subset of scenarios")
+    parser.add_argument("--unique", action=argparse.BooleanOptionalAction, default=True,
+                        help="Make requests distinct so coalescing does not hide tool latency (default)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression ratio")
+    parser.add_argument("--save-baseline", help="Write results as a baseline JSON")
+    parser.add_argument("--output", help="Write full results JSON")
+    args = parser.parse_args()
+
+    echo_url = args.echo_url
+    if not echo_url:
+        from echo_server import start_echo_server
+        host, port = start_echo_server().server_address[:2]
+        echo_url = f"http://{host}:{port}"
+    base_url = (args.target or start_local_gateway()).rstrip("/")
+
+    scenarios = build_scenarios(echo_url)
+    if args.scenarios:
+        wanted = [s.strip() for s in args.scenarios.split(",")]
+        unknown = [s for s in wanted if s not in scenarios]
+        if unknown:
+            parser.error(f"Unknown scenarios: {', '.join(unknown)}. Available: {', '.join(scenarios)}")
+        scenarios = {name: scenarios[name] for name in wanted}
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print(f"Target {base_url}  concurrency={args.concurrency}  requests={args.requests}  unique={args.unique}")
+    results = {}
+    for name, make_request in scenarios.items():
+        if args.warmup:
+            run_scenario(base_url, make_request, args.warmup, args.concurrency, args.unique, args.timeout)
+        results[name] = run_scenario(base_url, make_request, args.requests, args.concurrency,
+                                     args.unique, args.timeout)
+    print_table(results, baseline)
+
+    report = {
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "unique": args.unique,
+            "target": args.target or "in-process",
+        },
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Wrote {path}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions beyond tolerance:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print("\nNo regressions beyond tolerance.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,19 +2,65 @@
 Unified MCP Gateway Server
 Analyzes prompts with @keywords and routes to appropriate tools
 """
+import asyncio
+import inspect
+import json
+import os
 import re
-from fastapi import FastAPI, HTTPException, Request
-from pydantic import BaseModel
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 from typing import Optional, Any
 from core.mcp_runner import get_mcp_server
+from core.catalog import catalog_stats
+from core.db import plan_cache_stats, pool_stats
+from core.dispatcher import call_tool, singleflight
+from core.fleet import SNAPSHOT_DISK_PATHS, get_fleet, start_fleet, stop_fleet
+from core.http_cache import http_cache
+from core.jobs import JobStoreFull, get_job_store, iter_json
+from core.metrics_hub import get_metrics_hub
+from core.placement import INLINE, placement_stats, shutdown_process_pool, tool_placement
+from core.progress import ToolCancelled, ToolContext
+from core.resilience import CircuitOpen, ToolTimeout, breaker_states, tool_timeout
+from core.results import blob_store, build_tool_result, iter_blob, read_blob_text
+from core.slowlog import slowlog
+from core.warmup import run_warmup, warmup_state
+from scripts.host_status import get_host_snapshot
 
-app = FastAPI(title="mcp-server-own", description="Unified MCP Gateway")
+# How often a waiting request checks whether its HTTP client went away
+DISCONNECT_POLL_INTERVAL = float(os.getenv("DISCONNECT_POLL_INTERVAL", "0.5"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Slow-request log writer (opens SLOWLOG_PATH once, off the request path)
+    slowlog.start()
+    # Fleet mode: poll peer gateways when FLEET_PEERS is set
+    start_fleet()
+    # Warm up in the background; /ready turns 200 when it completes
+    warmup = asyncio.ensure_future(run_warmup({"tools_list": lambda: len(render_tools_list())}))
+    try:
+        yield
+    finally:
+        warmup.cancel()
+        await stop_fleet()
+        shutdown_process_pool()
+
+
+app = FastAPI(title="mcp-server-own", description="Unified MCP Gateway", lifespan=lifespan)
 mcp = get_mcp_server()
 
 
 class PromptRequest(BaseModel):
     prompt: str
     params: dict = {}
+    run_async: bool = Field(False, alias="async")
+
+    class Config:
+        allow_population_by_field_name = True
 
 
 class MCPRequest(BaseModel):
@@ -37,14 +83,45 @@ def parse_keyword(prompt: str) -> tuple[str, str]:
     return None, prompt
 
 
+def parse_schema_prompt(prompt: str) -> dict:
+    """'@schema [postgres|vertica] [table]' -> describe_schema arguments"""
+    words = prompt.split()
+    args = {}
+    if words and words[0].lower() in ("postgres", "psql", "pg", "vertica"):
+        args["backend"] = words.pop(0).lower()
+    if words:
+        args["table"] = words[0]
+    return args
+
+
+def parse_fleet_prompt(prompt: str) -> dict:
+    """'@fleet disk > 80', '@fleet top 5 cpu' -> fleet_status arguments"""
+    args = {}
+    metric = re.search(r"\b(disk|cpu|memory|mem|load)\b", prompt, re.IGNORECASE)
+    if metric:
+        name = metric.group(1).lower()
+        args["metric"] = "memory" if name == "mem" else name
+    threshold = re.search(r"(?:>=?|\babove\b|\bover\b)\s*(\d+(?:\.\d+)?)", prompt, re.IGNORECASE)
+    if threshold:
+        args["threshold"] = float(threshold.group(1))
+    top = re.search(r"\btop\s*(\d+)", prompt, re.IGNORECASE)
+    if top:
+        args["top_n"] = int(top.group(1))
+    return args
+
+
 KEYWORD_TOOL_MAP = {
     "psql": "postgres_query",
+    "pgshard": "postgres_shard_query",
     "vertica": "vertica_query",
+    "schema": "describe_schema",
+    "fleet": "fleet_status",
     "osname": "get_os_name",
     "sysinfo": "get_system_resources",
     "diskusage": "get_disk_usage",
     "diskcheck": "check_disk_space_warning",
     "process": "get_process_info",
+    "dirsize": "get_directory_sizes",
     "rest": "rest_call",
     "hello": "hello",
 }
@@ -59,6 +136,13 @@ def root():
     }
 
 
+@app.get("/ready")
+def ready():
+    """Readiness probe: 503 until startup warm-up has finished"""
+    state = warmup_state.snapshot()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+
 @app.get("/mcp/tools")
 def list_tools():
     """List all available tools"""
@@ -80,8 +164,58 @@ def list_tools():
     }
 
 
+async def _await_tool_call(http_request: Optional[Request], call):
+    """Await a tool call, cancelling it if the HTTP client disconnects.
+
+    Cancelling the call abandons it in the dispatcher, which cancels the
+    tool's context and with it any statement still running on a database.
+    """
+    task = asyncio.ensure_future(call)
+    if http_request is None:
+        return await task
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client closed request")
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+
+def _check_tool_args(tool_name: str, kwargs: dict) -> Optional[str]:
+    """Error message if the tool does not accept these arguments, else None"""
+    from core.mcp_runner import TOOLS
+
+    try:
+        inspect.signature(TOOLS[tool_name]).bind(**kwargs)
+    except TypeError as e:
+        return f"Invalid arguments for '{tool_name}': {e}"
+    return None
+
+
+def _encode_json(content: Any) -> JSONResponse:
+    return JSONResponse(jsonable_encoder(content))
+
+
+async def _tool_response(tool_name: str, content: dict):
+    """Route body carrying a tool result, encoded off the event loop.
+
+    Results (query rows, process lists) can be large, and FastAPI would
+    otherwise encode them on the loop. Inline tools return small results,
+    so they skip the executor round trip.
+    """
+    if tool_placement(tool_name) == INLINE:
+        return content
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _encode_json, content)
+
+
 @app.post("/mcp/query")
-async def query_with_prompt(request: PromptRequest):
+async def query_with_prompt(request: PromptRequest, http_request: Request):
     """
     Main entry point - analyzes prompt and routes to appropriate tool
     Example: {"prompt": "@osname show system info"}
@@ -111,44 +245,222 @@ async def query_with_prompt(request: PromptRequest):
                 detail=f"Tool '{tool_name}' not found in TOOLS registry"
             )
         
-        tool_func = TOOLS[tool_name]
-        
         # Route-specific argument mapping
-        try:
-            if keyword in ["psql", "vertica"]:
-                # SQL queries
-                result = tool_func(sql=cleaned_prompt)
-            elif keyword == "hello":
-                # Greeting - pass message
-                result = tool_func(message=cleaned_prompt)
-            elif keyword == "rest":
-                # REST calls - pass URL
-                result = tool_func(url=cleaned_prompt)
-            elif keyword in ["diskusage", "diskcheck"]:
-                # Disk tools - pass path if provided
-                if cleaned_prompt and cleaned_prompt.strip():
-                    result = tool_func(path=cleaned_prompt.strip())
-                else:
-                    result = tool_func()  # Use default path
-            else:
-                # No-argument tools (osname, sysinfo, process)
-                result = tool_func()
-        except TypeError as e:
-            # If argument mismatch, try calling with no args
-            result = tool_func()
-        
-        return {
+        if keyword in ["psql", "pgshard", "vertica"]:
+            # SQL queries
+            kwargs = {"sql": cleaned_prompt}
+        elif keyword == "schema":
+            # Schema lookup - optional backend and table
+            kwargs = parse_schema_prompt(cleaned_prompt)
+        elif keyword == "fleet":
+            # Fleet query - metric, threshold, top N
+            kwargs = parse_fleet_prompt(cleaned_prompt)
+        elif keyword == "hello":
+            # Greeting - pass message
+            kwargs = {"message": cleaned_prompt}
+        elif keyword == "rest":
+            # REST calls - pass URL
+            kwargs = {"url": cleaned_prompt}
+        elif keyword in ["diskusage", "diskcheck", "dirsize"] and cleaned_prompt.strip():
+            # Disk tools - pass path if provided
+            kwargs = {"path": cleaned_prompt.strip()}
+        else:
+            # No-argument tools (osname, sysinfo, process), disk tools with default path
+            kwargs = {}
+        # Extra tool arguments (e.g. {"approx": true} for SQL tools)
+        kwargs = {**request.params, **kwargs}
+        error = _check_tool_args(tool_name, kwargs)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+
+        if request.run_async:
+            # Background job - poll /jobs/{job_id}
+            try:
+                job = get_job_store().submit(tool_name, kwargs, keyword)
+            except JobStoreFull as e:
+                raise HTTPException(status_code=429, detail=str(e))
+            return JSONResponse(status_code=202, content=_job_accepted(job))
+
+        result = await _await_tool_call(http_request, call_tool(tool_name, kwargs, keyword=keyword))
+
+        return await _tool_response(tool_name, {
             "keyword": keyword,
             "tool": tool_name,
             "prompt": cleaned_prompt,
             "result": result
-        }
+        })
+    except HTTPException:
+        raise
+    except ToolTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except CircuitOpen as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _job_accepted(job) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "tool": job.tool_name,
+        "status_url": f"/jobs/{job.id}",
+        "result_url": f"/jobs/{job.id}/result",
+    }
+
+
+# Job and status endpoints are async so they run on the event loop that owns
+# the job store and the tasks (Task.cancel is not thread-safe)
+@app.get("/jobs")
+async def list_jobs():
+    """List background jobs"""
+    return {"jobs": get_job_store().list()}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Background job status and latest progress"""
+    job = get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found or expired")
+    return job.summary()
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """Background job result, streamed as JSON"""
+    job = get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found or expired")
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is {job.status}")
+    body = {"job_id": job.id, "tool": job.tool_name, "status": job.status}
+    if job.error:
+        body["error"] = job.error
+    body["result"] = job.result
+    return StreamingResponse(iter_json(body), media_type="application/json")
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a running/queued job, or discard a finished one"""
+    job = get_job_store().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found or expired")
+    return {"job_id": job.id, "status": job.status}
+
+
+@app.get("/results/{blob_id}")
+def spilled_result(blob_id: str):
+    """Full JSON of a tools/call result that was too large to inline"""
+    f = blob_store.open(blob_id)
+    if f is None:
+        raise HTTPException(status_code=404, detail=f"Result '{blob_id}' not found or expired")
+    return StreamingResponse(iter_blob(f), media_type="application/json")
+
+
+@app.get("/status")
+async def status():
+    """Gateway runtime counters"""
+    from core.mcp_runner import TOOLS
+
+    return {
+        "coalescing": singleflight.stats(),
+        "breakers": breaker_states(),
+        "db_pools": pool_stats(),
+        "plan_cache": plan_cache_stats.snapshot(),
+        "schema_catalogs": catalog_stats(),
+        "http_cache": http_cache.stats(),
+        "slow_requests": slowlog.stats(),
+        "jobs": get_job_store().stats(),
+        "metric_streams": get_metrics_hub().stats(),
+        "fleet": get_fleet().stats() if get_fleet() else None,
+        "placement": placement_stats(),
+        "timeouts": {name: tool_timeout(name) for name in TOOLS},
+    }
+
+
+@app.get("/slow-requests")
+def slow_requests(limit: int = 20, tool: Optional[str] = None):
+    """Slowest recent tool calls (above SLOWLOG_THRESHOLD_MS), worst first"""
+    return {"threshold_ms": slowlog.threshold_ms, "entries": slowlog.worst(limit, tool)}
+
+
+@app.get("/host/snapshot")
+async def host_snapshot():
+    """Non-blocking host summary polled by fleet aggregators"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_host_snapshot, SNAPSHOT_DISK_PATHS)
+
+
+@app.websocket("/ws/metrics")
+async def metrics_stream(websocket: WebSocket):
+    """
+    Metric subscriptions over WebSocket, fed by one shared sampler per metric
+    Client messages: {"action": "subscribe", "metric": "system_resources", "interval": 1}
+    and {"action": "unsubscribe", "metric": "..."}. ?metric=...&interval=...
+    subscribes on connect.
+    """
+    await websocket.accept()
+    hub = get_metrics_hub()
+    send_lock = asyncio.Lock()
+    subscriptions: dict = {}
+    pumps: dict = {}
+
+    async def send(message: dict):
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def pump(sub):
+        while True:
+            await send(await sub.queue.get())
+
+    def unsubscribe(metric: str) -> bool:
+        sub = subscriptions.pop(metric, None)
+        if sub is None:
+            return False
+        pumps.pop(metric).cancel()
+        hub.unsubscribe(sub)
+        return True
+
+    async def subscribe(metric: Any, interval: Any):
+        try:
+            unsubscribe(metric)
+            sub = hub.subscribe(metric, interval)
+        except (TypeError, ValueError) as e:
+            await send({"type": "error", "message": str(e)})
+            return
+        subscriptions[metric] = sub
+        pumps[metric] = asyncio.ensure_future(pump(sub))
+        await send({"type": "subscribed", "metric": metric, "interval": sub.interval})
+
+    try:
+        if websocket.query_params.get("metric"):
+            await subscribe(websocket.query_params["metric"], websocket.query_params.get("interval", 1))
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action = message.get("action")
+            except (ValueError, AttributeError):
+                await send({"type": "error", "message": "Expected a JSON object"})
+                continue
+            if action == "subscribe":
+                await subscribe(message.get("metric"), message.get("interval", 1))
+            elif action == "unsubscribe":
+                metric = message.get("metric")
+                if unsubscribe(metric):
+                    await send({"type": "unsubscribed", "metric": metric})
+            else:
+                await send({"type": "error", "message": f"Unknown action '{action}'"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for metric in list(subscriptions):
+            unsubscribe(metric)
+
+
 @app.get("/mcp/{tool_name}")
-def call_tool_direct(tool_name: str, request: Request):
+async def call_tool_direct(tool_name: str, request: Request):
     """Direct tool call without @keyword routing"""
     try:
         from core.mcp_runner import TOOLS
@@ -159,145 +471,333 @@ def call_tool_direct(tool_name: str, request: Request):
                 detail=f"Tool '{tool_name}' not found. Available tools: {list(TOOLS.keys())}"
             )
         
-        tool_func = TOOLS[tool_name]
         # Get query parameters as dict
         kwargs = dict(request.query_params)
-        result = tool_func(**kwargs)
-        return {"tool": tool_name, "result": result}
+        error = _check_tool_args(tool_name, kwargs)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+        result = await _await_tool_call(request, call_tool(tool_name, kwargs))
+        return await _tool_response(tool_name, {"tool": tool_name, "result": result})
+    except HTTPException:
+        raise
+    except ToolTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except CircuitOpen as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+SUPPORTED_PROTOCOL_VERSIONS = ["2025-06-18", "2025-03-26", "2024-11-05"]
+# Streamable HTTP clients send MCP-Protocol-Version after initialize (2025-06-18);
+# without the header the server assumes 2025-03-26
+DEFAULT_HEADER_PROTOCOL_VERSION = "2025-03-26"
+
+# In-flight tools/call requests by (Mcp-Session-Id, JSON-RPC id), for
+# notifications/cancelled; ids are only unique within one client's session.
+# Values are a ToolContext (streamed calls) or the waiting asyncio.Task.
+ACTIVE_CALLS: dict = {}
+
+
+_TOOLS_LIST: Optional[list] = None
+
+
+def render_tools_list() -> list:
+    """tools/list payload (built once; the registry is static after import)"""
+    global _TOOLS_LIST
+    if _TOOLS_LIST is None:
+        from core.mcp_runner import TOOLS
+
+        _TOOLS_LIST = [
+            {
+                "name": name,
+                "description": func.__doc__ or "No description",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "prompt": {"type": "string", "description": "Prompt with @keyword"},
+                        "params": {"type": "object", "description": "Additional parameters"}
+                    }
+                }
+            }
+            for name, func in TOOLS.items()
+        ]
+    return _TOOLS_LIST
+
+
+def _rpc_error(request_id: Any, code: int, message: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message}
+    }
+
+
+def _call_key(http_request: Optional[Request], request_id: Any) -> tuple:
+    session_id = http_request.headers.get("mcp-session-id") if http_request is not None else None
+    return session_id, request_id
+
+
+def _protocol_version(http_request: Optional[Request]) -> str:
+    if http_request is None:
+        return DEFAULT_HEADER_PROTOCOL_VERSION
+    return http_request.headers.get("mcp-protocol-version", DEFAULT_HEADER_PROTOCOL_VERSION)
+
+
+async def _tool_call_result(request_id: Any, tool_name: str, result: Any, protocol_version: str) -> dict:
+    # Encoding (and spilling) large results is blocking work
+    loop = asyncio.get_running_loop()
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "result": await loop.run_in_executor(None, build_tool_result, tool_name, result, protocol_version),
+    }
+
+
+def _sse_event(message: dict) -> str:
+    return f"event: message\ndata: {json.dumps(message, default=str)}\n\n"
+
+
+async def _stream_tool_call(request_id: Any, progress_token: Any, ctx: ToolContext, tool_name: str, args: dict,
+                            protocol_version: str, call_key: tuple):
+    """SSE stream: notifications/progress events followed by the final response"""
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def on_progress(progress, total, message):
+        params = {"progressToken": progress_token, "progress": progress}
+        if total is not None:
+            params["total"] = total
+        if message:
+            params["message"] = message
+        notification = {"jsonrpc": "2.0", "method": "notifications/progress", "params": params}
+        loop.call_soon_threadsafe(events.put_nowait, notification)
+
+    ctx.on_progress = on_progress
+    task = asyncio.ensure_future(call_tool(tool_name, args, ctx=ctx))
+    try:
+        while not task.done():
+            getter = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait({task, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield _sse_event(getter.result())
+            else:
+                getter.cancel()
+        while not events.empty():
+            yield _sse_event(events.get_nowait())
+
+        try:
+            result = task.result()
+        except ToolCancelled:
+            # Cancelled requests get no response (MCP cancellation spec)
+            return
+        except Exception as e:
+            yield _sse_event(_rpc_error(request_id, -32603, str(e)))
+            return
+        yield _sse_event(await _tool_call_result(request_id, tool_name, result, protocol_version))
+    finally:
+        # Client went away or stream finished: stop the tool and free the worker
+        if not task.done():
+            ctx.cancel()
+        ACTIVE_CALLS.pop(call_key, None)
+
+
 @app.post("/mcp")
-async def mcp_jsonrpc(request: MCPRequest):
+async def mcp_jsonrpc(http_request: Request):
     """
-    MCP JSON-RPC endpoint for GitHub Copilot HTTP integration
+    MCP JSON-RPC endpoint (streamable HTTP transport)
+    Accepts a single message or a batch. tools/call requests carrying
+    params._meta.progressToken from clients that accept text/event-stream are
+    answered as an SSE stream with notifications/progress events.
+    """
+    try:
+        body = await http_request.json()
+    except ValueError:
+        return JSONResponse(_rpc_error(None, -32700, "Parse error"))
+
+    accepts_sse = "text/event-stream" in http_request.headers.get("accept", "")
+
+    if isinstance(body, list):
+        if not body:
+            return JSONResponse(_rpc_error(None, -32600, "Empty batch"))
+        responses = await asyncio.gather(*(_handle_message(item, False, http_request) for item in body))
+        responses = [r for r in responses if r is not None]
+        return JSONResponse(responses) if responses else Response(status_code=202)
+
+    response = await _handle_message(body, accepts_sse, http_request)
+    if response is None:
+        return Response(status_code=202)
+    if isinstance(response, Response):
+        return response
+    headers = None
+    if isinstance(body, dict) and body.get("method") == "initialize" and "result" in response:
+        # Scopes request ids for notifications/cancelled to this client
+        headers = {"Mcp-Session-Id": uuid.uuid4().hex}
+    return JSONResponse(response, headers=headers)
+
+
+async def _handle_message(body: Any, accepts_sse: bool, http_request: Optional[Request] = None):
+    """Handle one JSON-RPC message; returns None for notifications"""
+    try:
+        request = MCPRequest(**body)
+    except (TypeError, ValidationError) as e:
+        request_id = body.get("id") if isinstance(body, dict) else None
+        return _rpc_error(request_id, -32600, f"Invalid Request: {e}")
+
+    try:
+        return await _handle_rpc(request, accepts_sse, http_request)
+    except Exception as e:
+        return _rpc_error(request.id, -32603, str(e))
+
+
+async def _handle_rpc(request: MCPRequest, accepts_sse: bool, http_request: Optional[Request] = None):
+    """
+    MCP JSON-RPC dispatch for GitHub Copilot HTTP integration
     Handles tools/list and tools/call methods
     """
     from core.mcp_runner import TOOLS
-    
-    try:
-        if request.method == "tools/list":
-            # Return list of available tools
-            tools = []
-            for name, func in TOOLS.items():
-                tools.append({
-                    "name": name,
-                    "description": func.__doc__ or "No description",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "prompt": {"type": "string", "description": "Prompt with @keyword"},
-                            "params": {"type": "object", "description": "Additional parameters"}
-                        }
-                    }
-                })
-            
-            return {
-                "jsonrpc": "2.0",
-                "id": request.id,
-                "result": {"tools": tools}
-            }
-        
-        elif request.method == "tools/call":
-            # Call a tool
-            params = request.params or {}
-            tool_name = params.get("name")
-            arguments = params.get("arguments", {})
-            
-            # Extract prompt
-            prompt = arguments.get("prompt", "")
-            tool_params = arguments.get("params", {})
-            
-            # Parse keyword from prompt
-            keyword, cleaned_prompt = parse_keyword(prompt)
-            
-            if not keyword:
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request.id,
-                    "error": {
-                        "code": -32602,
-                        "message": f"No @keyword found. Available: {', '.join(KEYWORD_TOOL_MAP.keys())}"
-                    }
-                }
-            
-            tool_func_name = KEYWORD_TOOL_MAP.get(keyword)
-            if not tool_func_name or tool_func_name not in TOOLS:
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request.id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Unknown keyword '@{keyword}'"
-                    }
-                }
-            
-            tool_func = TOOLS[tool_func_name]
-            
-            # Prepare arguments
-            args = tool_params.copy()
-            
-            # Route based on keyword
-            if keyword in ["psql", "vertica"]:
-                args["sql"] = cleaned_prompt
-            elif keyword == "hello":
-                args["message"] = cleaned_prompt
-            elif keyword == "rest":
-                args["url"] = cleaned_prompt
-            elif keyword in ["diskusage", "diskcheck"]:
-                if cleaned_prompt and cleaned_prompt.strip():
-                    args["path"] = cleaned_prompt.strip()
-            
-            # Execute tool
-            result = tool_func(**args)
-            
-            return {
-                "jsonrpc": "2.0",
-                "id": request.id,
-                "result": {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": str(result)
-                        }
-                    ]
-                }
-            }
-        
-        elif request.method == "initialize":
+
+    if request.method.startswith("notifications/"):
+        if request.method == "notifications/cancelled":
+            request_id = (request.params or {}).get("requestId")
+            ctx = ACTIVE_CALLS.get(_call_key(http_request, request_id))
+            if ctx is not None:
+                ctx.cancel()
+        return None
+
+    if request.method == "tools/list":
+        return {
+            "jsonrpc": "2.0",
+            "id": request.id,
+            "result": {"tools": render_tools_list()}
+        }
+
+    elif request.method == "tools/call":
+        # Call a tool
+        params = request.params or {}
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        progress_token = (params.get("_meta") or {}).get("progressToken")
+
+        # Extract prompt
+        prompt = arguments.get("prompt", "")
+        tool_params = arguments.get("params", {})
+
+        # Parse keyword from prompt
+        keyword, cleaned_prompt = parse_keyword(prompt)
+
+        if not keyword:
+            return _rpc_error(
+                request.id, -32602,
+                f"No @keyword found. Available: {', '.join(KEYWORD_TOOL_MAP.keys())}"
+            )
+
+        tool_func_name = KEYWORD_TOOL_MAP.get(keyword)
+        if not tool_func_name or tool_func_name not in TOOLS:
+            return _rpc_error(request.id, -32601, f"Unknown keyword '@{keyword}'")
+
+        # Prepare arguments
+        args = tool_params.copy()
+
+        # Route based on keyword
+        if keyword in ["psql", "pgshard", "vertica"]:
+            args["sql"] = cleaned_prompt
+        elif keyword == "schema":
+            args.update(parse_schema_prompt(cleaned_prompt))
+        elif keyword == "fleet":
+            args.update(parse_fleet_prompt(cleaned_prompt))
+        elif keyword == "hello":
+            args["message"] = cleaned_prompt
+        elif keyword == "rest":
+            args["url"] = cleaned_prompt
+        elif keyword in ["diskusage", "diskcheck", "dirsize"]:
+            if cleaned_prompt and cleaned_prompt.strip():
+                args["path"] = cleaned_prompt.strip()
+
+        error = _check_tool_args(tool_func_name, args)
+        if error:
+            return _rpc_error(request.id, -32602, error)
+
+        if arguments.get("async"):
+            try:
+                job = get_job_store().submit(tool_func_name, args, keyword)
+            except JobStoreFull as e:
+                return _rpc_error(request.id, -32000, str(e))
+            accepted = _job_accepted(job)
             return {
                 "jsonrpc": "2.0",
                 "id": request.id,
                 "result": {
-                    "protocolVersion": "2024-11-05",
-                    "serverInfo": {
-                        "name": "mcp-server-own",
-                        "version": "1.0.0"
-                    },
-                    "capabilities": {
-                        "tools": {}
-                    }
+                    "content": [{"type": "text", "text": json.dumps(accepted)}],
+                    "structuredContent": accepted,
                 }
             }
-        
-        else:
-            return {
-                "jsonrpc": "2.0",
-                "id": request.id,
-                "error": {
-                    "code": -32601,
-                    "message": f"Method not found: {request.method}"
+
+        call_key = _call_key(http_request, request.id)
+        if progress_token is not None and accepts_sse:
+            ctx = ToolContext()
+            if request.id is not None:
+                ACTIVE_CALLS[call_key] = ctx
+            return StreamingResponse(
+                _stream_tool_call(request.id, progress_token, ctx, tool_func_name, args,
+                                  _protocol_version(http_request), call_key),
+                media_type="text/event-stream",
+            )
+
+        # Execute tool (coalesced with identical in-flight calls)
+        task = asyncio.ensure_future(call_tool(tool_func_name, args))
+        if request.id is not None:
+            ACTIVE_CALLS[call_key] = task
+        try:
+            result = await _await_tool_call(http_request, task)
+        except HTTPException:
+            # Client disconnected; nobody is left to read a response
+            return None
+        except (ToolCancelled, asyncio.CancelledError):
+            # Re-raise if this handler itself is being cancelled (client disconnect)
+            if asyncio.current_task().cancelling():
+                raise
+            # Cancelled requests get no response (MCP cancellation spec)
+            return None
+        finally:
+            ACTIVE_CALLS.pop(call_key, None)
+
+        return await _tool_call_result(request.id, tool_func_name, result, _protocol_version(http_request))
+
+    elif request.method == "initialize":
+        requested = (request.params or {}).get("protocolVersion")
+        version = requested if requested in SUPPORTED_PROTOCOL_VERSIONS else SUPPORTED_PROTOCOL_VERSIONS[0]
+        return {
+            "jsonrpc": "2.0",
+            "id": request.id,
+            "result": {
+                "protocolVersion": version,
+                "serverInfo": {
+                    "name": "mcp-server-own",
+                    "version": "1.0.0"
+                },
+                "capabilities": {
+                    "tools": {},
+                    "resources": {}
                 }
             }
-    
-    except Exception as e:
+        }
+
+    elif request.method == "resources/read":
+        # Spilled tools/call results (resource_link URIs)
+        uri = (request.params or {}).get("uri", "")
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(None, read_blob_text, uri)
+        if text is None:
+            return _rpc_error(request.id, -32002, f"Resource not found: {uri}")
         return {
             "jsonrpc": "2.0",
             "id": request.id,
-            "error": {
-                "code": -32603,
-                "message": str(e)
-            }
+            "result": {"contents": [{"uri": uri, "mimeType": "application/json", "text": text}]},
         }
-        
+
+    elif request.method == "ping":
+        return {"jsonrpc": "2.0", "id": request.id, "result": {}}
+
+    else:
+        return _rpc_error(request.id, -32601, f"Method not found: {request.method}")
@@ -0,0 +1,185 @@
+"""Approximate answers for aggregate SQL via table sampling.
+
+An eligible query is a single-table SELECT whose output columns are group
+keys or plain COUNT/SUM/AVG/MIN/MAX calls. Eligible queries are rewritten to
+read a TABLESAMPLE of the table. COUNT and SUM results are then scaled by
+100/percent. Each estimate gets a 95% margin of error, computed from extra
+hidden aggregates that the rewrite appends to the select list. The bounds
+assume row-level sampling (Vertica, Postgres BERNOULLI); with Postgres
+SYSTEM block sampling rows are clustered, so no margins are reported.
+MIN/MAX come from the sample and carry no bound.
+
+Anything else (joins, subqueries in FROM, DISTINCT, HAVING, window
+functions, set operations, compound aggregate expressions) is reported as
+ineligible and runs exactly.
+"""
+
+import math
+import os
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from core.sql_parse import _split_top_level, find_clause, mask_sql
+
+APPROX_SAMPLE_PERCENT = float(os.getenv("APPROX_SAMPLE_PERCENT", "1"))
+# Postgres sampling method: BERNOULLI (row-level) or SYSTEM (block-level, faster, no margins)
+APPROX_PG_METHOD = os.getenv("APPROX_PG_METHOD", "BERNOULLI").upper()
+Z_95 = 1.96
+HIDDEN_PREFIX = "mcp_approx_"
+
+_AGG_CALL = re.compile(
+    r"\b(count|sum|avg|min|max|stddev\w*|var\w*|array_agg|string_agg|listagg|percentile\w*|approximate_\w+)\s*\(",
+    re.IGNORECASE,
+)
+_SIMPLE_AGG = re.compile(
+    r"^(?P<func>count|sum|avg|min|max)\s*\(\s*\)(?:\s+(?:as\s+)?(?P<alias>\w+))?$",
+    re.IGNORECASE,
+)
+_INELIGIBLE = re.compile(
+    r"\b(join|having|union|intersect|except|over|window|tablesample|distinct)\b",
+    re.IGNORECASE,
+)
+_FROM_END = re.compile(r"\b(where|group|order|limit|offset|fetch|for)\b|;", re.IGNORECASE)
+_TABLE_REF = re.compile(
+    r"^(?P<table>[\w$]+(?:\.[\w$]+)*|\"[^\"]+\"(?:\.\"[^\"]+\")*)"
+    r"(?:\s+(?:as\s+)?(?P<alias>\w+))?$",
+    re.IGNORECASE,
+)
+
+
+class ApproxColumn(NamedTuple):
+    kind: str                    # "key", "count", "sum", "avg", "min", "max"
+    helpers: Tuple[int, ...]     # hidden column indexes: sum(x*x) [, count(x)]
+
+
+class ApproxPlan(NamedTuple):
+    sql: str
+    percent: float
+    columns: List[ApproxColumn]
+    hidden: int                  # number of hidden helper columns at the end
+
+
+def plan_approx(sql: str, percent: float = APPROX_SAMPLE_PERCENT,
+                dialect: str = "postgres") -> Tuple[Optional[ApproxPlan], Optional[str]]:
+    """(plan, None) for an eligible query, else (None, reason)"""
+    if not 0 < percent < 100:
+        return None, "sample percent must be between 0 and 100"
+    masked = mask_sql(sql)
+    if _INELIGIBLE.search(masked):
+        return None, "joins, DISTINCT, HAVING, window functions and set operations are not sampled"
+    select = re.match(r"\s*select\b", masked, re.IGNORECASE)
+    from_clause = find_clause(sql, "from", masked)
+    if not select or not from_clause:
+        return None, "not a SELECT ... FROM query"
+
+    # Output columns
+    start, end = select.end(), from_clause[0]
+    items = _split_top_level(sql[start:end], masked[start:end])
+    masked_items = _split_top_level(masked[start:end], masked[start:end])
+    columns: List[ApproxColumn] = []
+    hidden: List[str] = []
+    for item, masked_item in zip(items, masked_items):
+        match = _SIMPLE_AGG.match(masked_item)
+        if not match:
+            if _AGG_CALL.search(masked_item) or masked_item.endswith("*"):
+                return None, f"unsupported select item: {item}"
+            columns.append(ApproxColumn("key", ()))
+            continue
+        func = match.group("func").lower()
+        arg = item[item.index("(") + 1:item.rindex(")")].strip()
+        if re.match(r"distinct\b", arg, re.IGNORECASE):
+            return None, f"DISTINCT aggregates are not sampled: {item}"
+        if func in ("sum", "avg"):
+            # Square in floating point: integer columns would overflow int4/int8
+            squared = f"CAST({arg} AS DOUBLE PRECISION) * CAST({arg} AS DOUBLE PRECISION)"
+            helpers = [f"SUM({squared})"] + ([f"COUNT({arg})"] if func == "avg" else [])
+            indexes = []
+            for expr in helpers:
+                if expr not in hidden:
+                    hidden.append(expr)
+                indexes.append(hidden.index(expr))
+            columns.append(ApproxColumn(func, tuple(indexes)))
+        else:
+            columns.append(ApproxColumn(func, ()))
+    if not any(c.kind in ("count", "sum", "avg") for c in columns):
+        return None, "no COUNT/SUM/AVG aggregate to estimate"
+
+    # Single table reference
+    from_start = from_clause[1]
+    tail = _FROM_END.search(masked[from_start:])
+    from_end = from_start + tail.start() if tail else len(sql)
+    ref = _TABLE_REF.match(sql[from_start:from_end].strip())
+    if not ref or "," in masked[from_start:from_end] or "(" in masked[from_start:from_end]:
+        return None, "only a single-table FROM can be sampled"
+
+    table, alias = ref.group("table"), ref.group("alias")
+    pct = f"{percent:g}"
+    if dialect == "vertica":
+        sampled = f"{table} TABLESAMPLE({pct})" + (f" {alias}" if alias else "")
+    else:
+        sampled = f"{table}" + (f" {alias}" if alias else "") + f" TABLESAMPLE {APPROX_PG_METHOD} ({pct})"
+    extra = "".join(f", {expr} AS {HIDDEN_PREFIX}{i}" for i, expr in enumerate(hidden))
+    rewritten = (
+        sql[:end].rstrip() + extra + " FROM " + sampled + " " + sql[from_end:].lstrip()
+    ).rstrip()
+    return ApproxPlan(rewritten, percent, columns, len(hidden)), None
+
+
+def _number(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def scale_result(plan: ApproxPlan, columns: List[str], rows: List[list]) -> Dict[str, Any]:
+    """Scale sampled rows to estimates; returns columns, rows and per-cell margins"""
+    visible = len(columns) - plan.hidden
+    f = plan.percent / 100.0
+    scale = 1.0 / f
+    out_rows, margins = [], []
+    for row in rows:
+        helpers = row[visible:]
+        estimates, bounds = [], []
+        for spec, value in zip(plan.columns, row[:visible]):
+            estimate, margin = value, None
+            if spec.kind == "count" and value is not None:
+                estimate = round(value * scale)
+                margin = round(Z_95 * math.sqrt((1 - f) * value) / f)
+            elif spec.kind == "sum" and value is not None:
+                sum_sq = _number(helpers[spec.helpers[0]]) or 0.0
+                estimate = float(value) * scale
+                margin = Z_95 * math.sqrt((1 - f) * sum_sq) / f
+            elif spec.kind == "avg" and value is not None:
+                sum_sq = _number(helpers[spec.helpers[0]]) or 0.0
+                n = _number(helpers[spec.helpers[1]]) or 0.0
+                mean = float(value)
+                if n > 1:
+                    variance = max(sum_sq / n - mean * mean, 0.0) * n / (n - 1)
+                    margin = Z_95 * math.sqrt((1 - f) * variance / n)
+            estimates.append(estimate)
+            bounds.append(margin)
+        out_rows.append(estimates)
+        margins.append(bounds)
+    return {"columns": columns[:visible], "rows": out_rows, "margins": margins}
+
+
+def prepare(sql: str, sample_percent: Optional[float], dialect: str) -> Tuple[str, Optional[ApproxPlan], Dict[str, Any]]:
+    """(sql to run, plan or None, approx info for the tool result)"""
+    percent = float(sample_percent) if sample_percent else APPROX_SAMPLE_PERCENT
+    plan, reason = plan_approx(sql, percent, dialect)
+    if plan is None:
+        return sql, None, {"applied": False, "reason": reason}
+    method = "TABLESAMPLE" if dialect == "vertica" else f"TABLESAMPLE {APPROX_PG_METHOD}"
+    info = {"applied": True, "sample_percent": percent, "method": method}
+    if method != "TABLESAMPLE SYSTEM":
+        info["confidence"] = 0.95
+    return plan.sql, plan, info
+
+
+def finalize(plan: Optional[ApproxPlan], info: Dict[str, Any], result: Dict[str, Any]) -> None:
+    """Replace sampled columns/rows in result with estimates; margins go into info"""
+    if plan is None:
+        return
+    scaled = scale_result(plan, result["columns"], result["rows"])
+    result["columns"] = scaled["columns"]
+    result["rows"] = scaled["rows"]
+    if "confidence" in info:
+        info["margins"] = scaled["margins"]
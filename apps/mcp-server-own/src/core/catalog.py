@@ -0,0 +1,200 @@
+"""In-memory schema catalog for the SQL backends.
+
+Each backend's catalog (tables, columns, types, indexes or projections, row
+estimates) is loaded once. A daemon thread then reloads it every
+SCHEMA_CACHE_TTL seconds, so describe_schema lookups are served from memory.
+The request path reads the database only on the very first load;
+invalidate() wakes the refresher instead. If a reload fails, the previous
+snapshot stays in service and the error is reported next to it. A catalog
+replaced because its DSN changed has its refresher stopped.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.db import get_postgres_pool, get_vertica_pool
+
+SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "300"))
+
+_PG_COLUMNS = """
+SELECT table_schema, table_name, column_name, data_type, is_nullable
+FROM information_schema.columns
+WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
+ORDER BY table_schema, table_name, ordinal_position
+"""
+_PG_INDEXES = """
+SELECT schemaname, tablename, indexname, indexdef
+FROM pg_indexes
+WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
+"""
+_PG_ROW_ESTIMATES = """
+SELECT n.nspname, c.relname, c.reltuples::bigint
+FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE c.relkind IN ('r', 'p', 'm') AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+"""
+
+_VERTICA_COLUMNS = """
+SELECT table_schema, table_name, column_name, data_type, is_nullable
+FROM v_catalog.columns
+ORDER BY table_schema, table_name, ordinal_position
+"""
+_VERTICA_PROJECTIONS = """
+SELECT projection_schema, anchor_table_name, projection_name,
+       CASE WHEN is_segmented THEN 'segmented' ELSE 'replicated' END
+FROM v_catalog.projections
+"""
+_VERTICA_ROW_ESTIMATES = """
+SELECT anchor_table_schema, anchor_table_name,
+       SUM(row_count) // GREATEST(COUNT(DISTINCT projection_name), 1)
+FROM v_monitor.projection_storage
+GROUP BY anchor_table_schema, anchor_table_name
+"""
+
+# backend -> (DSN env var, pool getter, (columns, indexes, row estimates) SQL)
+BACKENDS: Dict[str, Tuple[str, Callable, Tuple[str, str, str]]] = {
+    "postgres": ("POSTGRES_DSN", get_postgres_pool, (_PG_COLUMNS, _PG_INDEXES, _PG_ROW_ESTIMATES)),
+    "vertica": ("VERTICA_DSN", get_vertica_pool, (_VERTICA_COLUMNS, _VERTICA_PROJECTIONS, _VERTICA_ROW_ESTIMATES)),
+}
+
+
+def _fetch_all(pool, sql: str) -> List[tuple]:
+    with pool.connection() as pooled:
+        cursor = pooled.conn.cursor()
+        try:
+            cursor.execute(sql)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+
+def load_catalog(backend: str, dsn: str) -> Dict[str, Dict[str, Any]]:
+    """Read the catalog from the database: {"schema.table": {...}}"""
+    _, get_pool, (columns_sql, indexes_sql, rows_sql) = BACKENDS[backend]
+    pool = get_pool(dsn)
+    tables: Dict[str, Dict[str, Any]] = {}
+
+    def table(schema, name):
+        return tables.setdefault(f"{schema}.{name}", {
+            "schema": schema, "table": name, "columns": [], "indexes": [], "row_estimate": None,
+        })
+
+    for schema, name, column, data_type, nullable in _fetch_all(pool, columns_sql):
+        table(schema, name)["columns"].append({
+            "name": column, "type": data_type, "nullable": str(nullable).upper() in ("YES", "TRUE", "T"),
+        })
+    for schema, name, index, definition in _fetch_all(pool, indexes_sql):
+        if f"{schema}.{name}" in tables:
+            tables[f"{schema}.{name}"]["indexes"].append({"name": index, "definition": definition})
+    for schema, name, estimate in _fetch_all(pool, rows_sql):
+        if f"{schema}.{name}" in tables:
+            tables[f"{schema}.{name}"]["row_estimate"] = max(int(estimate or 0), 0)
+    return tables
+
+
+class SchemaCatalog:
+    """One backend's cached catalog plus its background refresher"""
+
+    def __init__(self, backend: str, dsn: str, ttl: float = SCHEMA_CACHE_TTL,
+                 loader: Callable[[str, str], Dict[str, Dict[str, Any]]] = load_catalog):
+        self.backend = backend
+        self.dsn = dsn
+        self.ttl = ttl
+        self._loader = loader
+        self.tables: Optional[Dict[str, Dict[str, Any]]] = None
+        self.loaded_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.lookups = 0
+        self._load_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self, if_empty: bool = False) -> None:
+        """Reload from the database now (keeps the old snapshot on failure)"""
+        with self._load_lock:
+            if if_empty and self.tables is not None:
+                return
+            try:
+                tables = self._loader(self.backend, self.dsn)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                if self.tables is None:
+                    raise
+                return
+            self.tables = tables
+            self.loaded_at = time.time()
+            self.last_error = None
+            self.refreshes += 1
+
+    def _refresh_loop(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.ttl)
+            self._wake.clear()
+            if self._stopped:
+                return
+            try:
+                self.refresh()
+            except Exception:
+                pass  # recorded in last_error; the next cycle retries
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current tables, loading synchronously only if nothing is cached yet"""
+        if self.tables is None:
+            self.refresh(if_empty=True)
+        if self._thread is None:
+            with self._load_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._refresh_loop, name=f"catalog-{self.backend}", daemon=True)
+                    self._thread.start()
+        self.lookups += 1
+        return self.tables
+
+    def invalidate(self) -> None:
+        """Have the background refresher reload the catalog right away"""
+        self._wake.set()
+
+    def stop(self) -> None:
+        """End the background refresher (after any reload in progress)"""
+        self._stopped = True
+        self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tables": len(self.tables) if self.tables is not None else None,
+            "age_seconds": round(time.time() - self.loaded_at, 1) if self.loaded_at else None,
+            "ttl": self.ttl,
+            "lookups": self.lookups,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+_catalogs: Dict[str, SchemaCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(backend: str) -> Optional[SchemaCatalog]:
+    """Catalog for a backend, or None if its DSN is not configured"""
+    env_var = BACKENDS[backend][0]
+    dsn = os.getenv(env_var)
+    if not dsn:
+        return None
+    with _catalogs_lock:
+        catalog = _catalogs.get(backend)
+        if catalog is None or catalog.dsn != dsn:
+            if catalog is not None:
+                catalog.stop()
+            catalog = _catalogs[backend] = SchemaCatalog(backend, dsn)
+        return catalog
+
+
+def catalog_stats() -> Dict[str, Dict[str, Any]]:
+    with _catalogs_lock:
+        return {backend: catalog.stats() for backend, catalog in _catalogs.items()}
@@ -0,0 +1,186 @@
+"""Tool dispatch shared by every gateway route.
+
+Tools are blocking functions, so they run off the event loop inside a
+ToolContext, under a per-tool deadline and the circuit breaker of the
+dependency they hit (see core/resilience.py). Read-only calls without a
+caller-owned context are coalesced: identical concurrent calls (same tool,
+same normalized args) execute once and every waiter gets the same result
+object - callers must not mutate it. Only tools in COALESCABLE_TOOLS are
+coalesced, and rest_call only for GET/HEAD; a POST sent twice must run twice.
+
+Each tool runs inline, in the default thread pool or in a process pool,
+according to its placement (see core/placement.py).
+
+Every call is reported to the slow-request log (core/slowlog.py) with its
+phase timings.
+"""
+
+import asyncio
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from core.mcp_runner import TOOLS
+from core.placement import INLINE, PROCESS, get_process_pool, reset_process_pool, run_in_process, tool_placement
+from core.progress import ToolCancelled, ToolContext, run_with_context
+from core.resilience import (
+    ToolTimeout,
+    call_timeout,
+    dependency_key,
+    get_breaker,
+    is_dependency_failure,
+)
+from core.singleflight import SingleFlight, make_key
+from core.slowlog import call_entry, slowlog
+
+singleflight = SingleFlight()
+
+# Tools whose identical concurrent calls can safely share one execution
+COALESCABLE_TOOLS = {
+    "hello",
+    "get_os_name",
+    "get_system_resources",
+    "get_disk_usage",
+    "check_disk_space_warning",
+    "get_process_info",
+    "get_directory_sizes",
+    "vertica_query",
+    "postgres_query",
+    "postgres_shard_query",
+    "describe_schema",
+    "fleet_status",
+    "rest_call",
+}
+IDEMPOTENT_HTTP_METHODS = {"GET", "HEAD"}
+
+
+def is_coalescable(tool_name: str, args: Dict[str, Any]) -> bool:
+    if tool_name not in COALESCABLE_TOOLS:
+        return False
+    if tool_name == "rest_call":
+        return str(args.get("method", "GET")).upper() in IDEMPOTENT_HTTP_METHODS
+    return True
+
+
+def _run_timed(timings: Dict[str, float], ctx: ToolContext, func: Callable, args: Dict[str, Any]) -> Any:
+    timings["started"] = time.perf_counter()
+    try:
+        return run_with_context(ctx, func, **args)
+    finally:
+        timings["finished"] = time.perf_counter()
+
+
+async def _run_in_process(tool_name: str, args: Dict[str, Any], ctx: ToolContext,
+                          timings: Dict[str, float]) -> Any:
+    if ctx.cancelled:
+        raise ToolCancelled("Tool call cancelled")
+    pool = get_process_pool()
+    future = asyncio.get_running_loop().run_in_executor(pool, run_in_process, tool_name, args)
+    # Only a call still queued for a worker can be dropped; a running one completes
+    ctx.add_cancel_callback(future.cancel)
+    try:
+        timings["started"], timings["finished"], result = await future
+    except BrokenProcessPool:
+        reset_process_pool(pool)
+        raise
+    finally:
+        ctx.remove_cancel_callback(future.cancel)
+    return result
+
+
+def _submit(tool_name: str, args: Dict[str, Any], ctx: ToolContext, timings: Dict[str, float]) -> asyncio.Future:
+    loop = asyncio.get_running_loop()
+    placement = tool_placement(tool_name)
+    timings["submitted"] = time.perf_counter()
+    if placement == PROCESS:
+        return asyncio.ensure_future(_run_in_process(tool_name, args, ctx, timings))
+    if placement == INLINE:
+        future = loop.create_future()
+        try:
+            future.set_result(_run_timed(timings, ctx, TOOLS[tool_name], args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    return loop.run_in_executor(None, _run_timed, timings, ctx, TOOLS[tool_name], args)
+
+
+async def _execute(tool_name: str, args: Dict[str, Any], ctx: ToolContext,
+                   timings: Dict[str, float]) -> Any:
+    key = dependency_key(tool_name, args)
+    breaker = get_breaker(key) if key else None
+    if breaker:
+        breaker.before_call()
+
+    future = _submit(tool_name, args, ctx, timings)
+    timeout = call_timeout(tool_name, ctx)
+    try:
+        # shield: on timeout, cancel cooperatively through ctx instead
+        result = await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        ctx.cancel()
+        # The worker finishes (or raises ToolCancelled) later; nobody awaits it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        if breaker:
+            breaker.record_failure(f"timeout after {timeout}s")
+        raise ToolTimeout(f"Tool '{tool_name}' timed out after {timeout}s")
+    except (ToolCancelled, asyncio.CancelledError):
+        ctx.cancel()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        if breaker:
+            breaker.release()
+        raise
+    except (TypeError, ValueError):
+        # Bad arguments / input validation: not the dependency's fault
+        if breaker:
+            breaker.release()
+        raise
+    except Exception as e:
+        if breaker:
+            breaker.record_failure(str(e))
+        raise
+
+    if breaker:
+        if is_dependency_failure(tool_name, result):
+            breaker.record_failure(str(result.get("error") or result.get("status_code")))
+        else:
+            breaker.record_success()
+    return result
+
+
+async def call_tool(tool_name: str, args: Optional[Dict[str, Any]] = None,
+                    ctx: Optional[ToolContext] = None, keyword: Optional[str] = None) -> Any:
+    """Run a registered tool.
+
+    Pass ctx when the caller needs its own progress stream or cancellation;
+    such calls bypass coalescing, as do calls that are not idempotent.
+    keyword is only used for the slow-request log.
+    """
+    if tool_name not in TOOLS:
+        raise KeyError(f"Tool '{tool_name}' not found")
+    args = args or {}
+    key = make_key(tool_name, args)
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}  # stays empty for callers merged into another's execution
+    status, result = "error", None
+    try:
+        if ctx is not None:
+            result = await _execute(tool_name, args, ctx, timings)
+        elif not is_coalescable(tool_name, args):
+            result = await _execute(tool_name, args, ToolContext(), timings)
+        else:
+            shared_ctx = ToolContext()
+            result = await singleflight.do(
+                key,
+                lambda: _execute(tool_name, args, shared_ctx, timings),
+                on_abandon=shared_ctx.cancel,
+            )
+        status = "ok"
+        return result
+    except ToolTimeout:
+        status = "timeout"
+        raise
+    except (ToolCancelled, asyncio.CancelledError):
+        status = "cancelled"
+        raise
+    finally:
+        slowlog.record(call_entry(tool_name, keyword, key, status, started, timings), result)
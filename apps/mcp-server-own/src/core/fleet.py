@@ -0,0 +1,185 @@
+"""Fleet mode: aggregate host status from peer gateways.
+
+When FLEET_PEERS lists peer gateway base URLs (comma-separated), this
+gateway polls each peer's GET /host/snapshot every FLEET_POLL_INTERVAL
+seconds. Polls run concurrently over one pooled HTTP session with a
+FLEET_TIMEOUT deadline. Their start times are staggered across the interval
+(plus jitter) so the fleet is never hit all at once. The latest snapshot per
+peer is kept in memory, and fleet queries (top-N, thresholds) are answered
+from it without touching the peers.
+"""
+
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+FLEET_POLL_INTERVAL = float(os.getenv("FLEET_POLL_INTERVAL", "15"))
+FLEET_TIMEOUT = float(os.getenv("FLEET_TIMEOUT", "3"))
+FLEET_CONCURRENCY = int(os.getenv("FLEET_CONCURRENCY", "16"))
+# Snapshots older than this many poll intervals are reported as stale
+FLEET_STALE_INTERVALS = float(os.getenv("FLEET_STALE_INTERVALS", "3"))
+# Disk paths reported by this gateway's own /host/snapshot
+SNAPSHOT_DISK_PATHS = [p.strip() for p in os.getenv("SNAPSHOT_DISK_PATHS", "/").split(",") if p.strip()]
+
+METRICS = ("disk", "cpu", "memory", "load")
+
+
+def fleet_peers() -> List[str]:
+    return [p.strip().rstrip("/") for p in os.getenv("FLEET_PEERS", "").split(",") if p.strip()]
+
+
+class PeerState:
+    def __init__(self, peer: str):
+        self.peer = peer
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.fetched_at: Optional[float] = None
+        self.latency_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.polls = 0
+        self.failures = 0
+
+    def age(self) -> Optional[float]:
+        return round(time.time() - self.fetched_at, 1) if self.fetched_at else None
+
+
+def _metric_value(snapshot: Dict[str, Any], metric: str, path: Optional[str]) -> Optional[float]:
+    if metric == "cpu":
+        return snapshot.get("cpu_percent")
+    if metric == "memory":
+        return snapshot.get("memory_percent")
+    if metric == "load":
+        loadavg = snapshot.get("loadavg") or []
+        return loadavg[0] if loadavg else None
+    disks = [d for d in snapshot.get("disks", []) if path is None or d["path"] == path]
+    return max((d["percent"] for d in disks), default=None)
+
+
+class FleetAggregator:
+    def __init__(self, peers: List[str], interval: float = FLEET_POLL_INTERVAL,
+                 timeout: float = FLEET_TIMEOUT, concurrency: int = FLEET_CONCURRENCY):
+        self.interval = interval
+        self.timeout = timeout
+        self.peers: Dict[str, PeerState] = {peer: PeerState(peer) for peer in peers}
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(len(peers), 1), pool_maxsize=2)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(peers))),
+                                            thread_name_prefix="fleet")
+        self._tasks: List[asyncio.Task] = []
+
+    def _fetch(self, peer: str) -> Dict[str, Any]:
+        resp = self._session.get(f"{peer}/host/snapshot", timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def poll(self, peer: str) -> None:
+        state = self.peers[peer]
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        state.polls += 1
+        try:
+            snapshot = await loop.run_in_executor(self._executor, self._fetch, peer)
+        except Exception as e:
+            state.failures += 1
+            state.error = str(e)
+            return
+        state.snapshot = snapshot
+        state.fetched_at = time.time()
+        state.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        state.error = None
+
+    async def poll_all(self) -> None:
+        await asyncio.gather(*(self.poll(peer) for peer in self.peers))
+
+    async def _poll_loop(self, index: int) -> None:
+        peer = list(self.peers)[index]
+        await asyncio.sleep(index * self.interval / len(self.peers))
+        while True:
+            await self.poll(peer)
+            await asyncio.sleep(self.interval * random.uniform(0.9, 1.1))
+
+    def start(self) -> None:
+        self._tasks = [asyncio.ensure_future(self._poll_loop(i)) for i in range(len(self.peers))]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+    def query(self, metric: str = "disk", threshold: Optional[float] = None,
+              top_n: int = 10, path: Optional[str] = None) -> Dict[str, Any]:
+        """Hosts ranked by metric (highest first), optionally only those >= threshold"""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Available: {', '.join(METRICS)}")
+        stale_after = self.interval * FLEET_STALE_INTERVALS
+        hosts, unreachable = [], []
+        for state in self.peers.values():
+            if state.snapshot is None:
+                unreachable.append({"peer": state.peer, "error": state.error or "not polled yet"})
+                continue
+            value = _metric_value(state.snapshot, metric, path)
+            if value is None or (threshold is not None and value < threshold):
+                continue
+            age = state.age()
+            hosts.append({
+                "host": state.snapshot.get("hostname"),
+                "peer": state.peer,
+                "value": value,
+                "age_seconds": age,
+                "stale": age is not None and age > stale_after,
+                **({"error": state.error} if state.error else {}),
+            })
+        hosts.sort(key=lambda h: h["value"], reverse=True)
+        return {
+            "metric": metric,
+            "threshold": threshold,
+            "fleet_size": len(self.peers),
+            "count": len(hosts),
+            "hosts": hosts[:top_n],
+            "unreachable": unreachable,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            state.peer: {
+                "age_seconds": state.age(),
+                "latency_ms": state.latency_ms,
+                "polls": state.polls,
+                "failures": state.failures,
+                "error": state.error,
+            }
+            for state in self.peers.values()
+        }
+
+
+_fleet: Optional[FleetAggregator] = None
+
+
+def get_fleet() -> Optional[FleetAggregator]:
+    return _fleet
+
+
+def start_fleet() -> Optional[FleetAggregator]:
+    """Start polling FLEET_PEERS (no-op when unset); call inside the event loop"""
+    global _fleet
+    peers = fleet_peers()
+    if _fleet is None and peers:
+        _fleet = FleetAggregator(peers)
+        _fleet.start()
+    return _fleet
+
+
+async def stop_fleet() -> None:
+    global _fleet
+    if _fleet is not None:
+        await _fleet.stop()
+        _fleet = None
@@ -0,0 +1,278 @@
+"""Private HTTP cache for rest_call (RFC 9111 subset).
+
+GET responses are stored in an in-memory LRU (HTTP_CACHE_MAX_ENTRIES). If
+HTTP_CACHE_DIR is set, they are also written to a JSON-file tier on disk that
+survives restarts. Freshness comes from Cache-Control max-age, or Expires
+minus Date, or 10% of the Last-Modified age as a heuristic for cacheable
+status codes, corrected by the Age header. Fresh entries are served without
+a request. Stale entries (and no-cache ones) are revalidated with
+If-None-Match / If-Modified-Since, and a 304 refreshes the stored entry.
+no-store responses, Vary: * responses and bodies over HTTP_CACHE_MAX_BODY
+are never stored.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "256"))
+HTTP_CACHE_MAX_BODY = int(os.getenv("HTTP_CACHE_MAX_BODY", str(1024 * 1024)))
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "")
+HTTP_CACHE_DISK_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_DISK_MAX_ENTRIES", "5000"))
+
+# Status codes whose responses may get a heuristic freshness lifetime
+HEURISTIC_STATUSES = {200, 203, 204, 300, 301, 404, 405, 410, 414, 501}
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX = 24 * 3600
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') if arg else None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _seconds(value: Optional[str]) -> Optional[int]:
+    return int(value) if value is not None and re.fullmatch(r"\d+", value) else None
+
+
+class CacheEntry:
+    def __init__(self, url: str, status: int, headers: Dict[str, str], text: str, response_time: float):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.text = text
+        self.response_time = response_time
+
+    @property
+    def cache_control(self) -> Dict[str, Optional[str]]:
+        return parse_cache_control(self.headers.get("cache-control", ""))
+
+    def freshness_lifetime(self) -> float:
+        cc = self.cache_control
+        max_age = _seconds(cc.get("max-age"))
+        if max_age is not None:
+            return max_age
+        date = _http_date(self.headers.get("date")) or self.response_time
+        expires = self.headers.get("expires")
+        if expires is not None:
+            expires_at = _http_date(expires)
+            return max(expires_at - date, 0) if expires_at else 0
+        last_modified = _http_date(self.headers.get("last-modified"))
+        if last_modified and self.status in HEURISTIC_STATUSES:
+            return min(max(date - last_modified, 0) * HEURISTIC_FRACTION, HEURISTIC_MAX)
+        return 0
+
+    def current_age(self, now: float) -> float:
+        date = _http_date(self.headers.get("date")) or self.response_time
+        apparent_age = max(0.0, self.response_time - date)
+        age_header = _seconds(self.headers.get("age")) or 0
+        return max(apparent_age, age_header) + (now - self.response_time)
+
+    def is_fresh(self, now: float) -> bool:
+        if "no-cache" in self.cache_control:
+            return False
+        return self.current_age(now) < self.freshness_lifetime()
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.headers.get("etag"):
+            headers["If-None-Match"] = self.headers["etag"]
+        if self.headers.get("last-modified"):
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"url": self.url, "status": self.status, "headers": self.headers,
+                "text": self.text, "response_time": self.response_time}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "CacheEntry":
+        return cls(data["url"], data["status"], data["headers"], data["text"], data["response_time"])
+
+
+def is_storable(status: int, headers: Dict[str, str], text: str) -> bool:
+    cc = parse_cache_control(headers.get("cache-control", ""))
+    if "no-store" in cc or headers.get("vary", "").strip() == "*":
+        return False
+    if len(text.encode("utf-8", "replace")) > HTTP_CACHE_MAX_BODY:
+        return False
+    explicit = "max-age" in cc or "expires" in headers
+    if status not in HEURISTIC_STATUSES and not explicit:
+        return False
+    return explicit or "no-cache" in cc or "etag" in headers or "last-modified" in headers
+
+
+class HttpCache:
+    def __init__(self, max_entries: int = HTTP_CACHE_MAX_ENTRIES, disk_dir: str = HTTP_CACHE_DIR):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0, "disk_hits": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        return f"{method.upper()} {url}"
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                entry = CacheEntry.from_json(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+        self.count("disk_hits")
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        self._remember(key, entry)
+        self.count("stores")
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(entry.to_json(), f)
+                os.replace(tmp, path)
+            except OSError:
+                pass
+            if self.counters["stores"] % 64 == 0:
+                self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Drop the least recently written files beyond HTTP_CACHE_DISK_MAX_ENTRIES"""
+        try:
+            files = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".json")]
+        except OSError:
+            return
+        if len(files) <= HTTP_CACHE_DISK_MAX_ENTRIES:
+            return
+        files.sort(key=lambda e: e.stat().st_mtime)
+        for entry in files[:len(files) - HTTP_CACHE_DISK_MAX_ENTRIES]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["revalidated"] + self.counters["misses"]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_dir": self.disk_dir or None,
+                **self.counters,
+                "hit_rate": round((self.counters["hits"] + self.counters["revalidated"]) / lookups, 3) if lookups else None,
+            }
+
+
+def lower_headers(headers) -> Dict[str, str]:
+    return {k.lower(): v for k, v in headers.items()}
+
+
+def merge_304(entry: CacheEntry, headers: Dict[str, str], response_time: float) -> Tuple[CacheEntry, bool]:
+    """Apply a 304's headers to the stored entry; False if it must not be stored anymore"""
+    merged = dict(entry.headers)
+    for name, value in headers.items():
+        if name not in ("content-length", "content-encoding", "transfer-encoding"):
+            merged[name] = value
+    updated = CacheEntry(entry.url, entry.status, merged, entry.text, response_time)
+    return updated, "no-store" not in updated.cache_control
+
+
+http_cache = HttpCache()
+
+
+def request(method: str, url: str, timeout: float) -> Tuple[int, str, str]:
+    """(status, text, cache status) for a request, going through the cache.
+
+    Cache status is "hit" (served without a request), "revalidated" (304 from
+    the origin), "miss" or "bypass" (not a GET).
+    """
+    method = method.upper()
+    key = http_cache.key("GET", url)
+    if method != "GET":
+        resp = requests.request(method, url, timeout=timeout)
+        if method not in ("HEAD", "OPTIONS") and resp.status_code < 400:
+            http_cache.delete(key)  # unsafe method invalidates the stored GET
+        return resp.status_code, resp.text, "bypass"
+
+    entry = http_cache.get(key)
+    if entry is not None and entry.is_fresh(time.time()):
+        http_cache.count("hits")
+        return entry.status, entry.text, "hit"
+
+    resp = requests.request("GET", url, headers=entry.validators() if entry else None, timeout=timeout)
+    response_time = time.time()
+    headers = lower_headers(resp.headers)
+    if resp.status_code == 304 and entry is not None:
+        http_cache.count("revalidated")
+        updated, storable = merge_304(entry, headers, response_time)
+        if storable:
+            http_cache.put(key, updated)
+        else:
+            http_cache.delete(key)
+        return entry.status, entry.text, "revalidated"
+
+    http_cache.count("misses")
+    if is_storable(resp.status_code, headers, resp.text):
+        http_cache.put(key, CacheEntry(url, resp.status_code, headers, resp.text, response_time))
+    elif entry is not None:
+        http_cache.delete(key)
+    return resp.status_code, resp.text, "miss"
@@ -0,0 +1,198 @@
+"""Background jobs for long-running tool calls.
+
+A job runs a tool through the dispatcher as a background task; at most
+JOB_WORKERS jobs execute at once and the rest wait queued. Jobs run under
+JOB_TIMEOUT instead of the tool's synchronous deadline. The store keeps
+at most JOB_STORE_MAX jobs; finished jobs expire JOB_RESULT_TTL seconds
+after completion (purged lazily on every store access), and the oldest
+finished jobs are evicted first when the store is full.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from core.dispatcher import call_tool
+from core.progress import ToolCancelled, ToolContext
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_STORE_MAX = int(os.getenv("JOB_STORE_MAX", "200"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "600"))
+# Jobs exist to outlive the synchronous deadlines, so they get their own
+# (also applied as the DB statement_timeout / RUNTIMECAP)
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+# Cancel requested while running; becomes CANCELLED when the tool returns
+CANCELLING = "cancelling"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobStoreFull(Exception):
+    """Every slot holds an unfinished job."""
+
+
+class Job:
+    def __init__(self, tool_name: str, args: Dict[str, Any], keyword: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.tool_name = tool_name
+        self.args = args
+        self.keyword = keyword
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress: Optional[Dict[str, Any]] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.cancel_requested_at: Optional[float] = None
+        self.ctx = ToolContext(on_progress=self._on_progress, timeout=JOB_TIMEOUT)
+        self.task: Optional[asyncio.Task] = None
+
+    def _on_progress(self, progress, total, message) -> None:
+        self.progress = {"progress": progress, "total": total, "message": message}
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "tool": self.tool_name,
+            "keyword": self.keyword,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+            "error": self.error,
+            "cancel_requested_at": self.cancel_requested_at,
+            "expires_at": self.finished_at + JOB_RESULT_TTL if self.finished_at else None,
+        }
+
+
+class JobStore:
+    def __init__(self, max_jobs: int = JOB_STORE_MAX, workers: int = JOB_WORKERS,
+                 ttl: float = JOB_RESULT_TTL):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs: Dict[str, Job] = {}
+        self._workers = asyncio.Semaphore(workers)
+        self.submitted = 0
+        self.expired = 0
+
+    def purge(self) -> None:
+        now = time.time()
+        for job_id in [j.id for j in self._jobs.values()
+                       if j.finished_at and now - j.finished_at >= self.ttl]:
+            del self._jobs[job_id]
+            self.expired += 1
+
+    def submit(self, tool_name: str, args: Dict[str, Any], keyword: Optional[str] = None) -> Job:
+        self.purge()
+        if len(self._jobs) >= self.max_jobs:
+            finished = sorted((j for j in self._jobs.values() if j.finished), key=lambda j: j.finished_at)
+            if not finished:
+                raise JobStoreFull(f"Job store is full ({self.max_jobs} unfinished jobs)")
+            del self._jobs[finished[0].id]
+
+        job = Job(tool_name, args, keyword)
+        self._jobs[job.id] = job
+        self.submitted += 1
+        job.task = asyncio.ensure_future(self._run(job))
+        return job
+
+    async def _run(self, job: Job) -> None:
+        try:
+            async with self._workers:
+                if job.ctx.cancelled:
+                    raise ToolCancelled("Job cancelled before start")
+                job.status = RUNNING
+                job.started_at = time.time()
+                result = await call_tool(job.tool_name, job.args, ctx=job.ctx, keyword=job.keyword)
+            # Tools that never poll the flag still run to completion; a
+            # cancelled job keeps no result
+            if job.cancel_requested_at:
+                raise ToolCancelled("Job cancelled while running")
+            job.result = result
+            job.status = SUCCEEDED
+        except (ToolCancelled, asyncio.CancelledError):
+            job.status = CANCELLED
+        except Exception as e:
+            if job.cancel_requested_at:
+                job.status = CANCELLED
+            else:
+                job.status = FAILED
+                job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.purge()
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        self.purge()
+        return [job.summary() for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel an unfinished job, or drop a finished one"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.finished:
+            del self._jobs[job_id]
+        else:
+            job.cancel_requested_at = job.cancel_requested_at or time.time()
+            job.ctx.cancel()
+            if job.status == QUEUED and job.task:
+                job.task.cancel()
+            elif job.status == RUNNING:
+                job.status = CANCELLING
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        self.purge()
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"stored": len(self._jobs), "submitted": self.submitted, "expired": self.expired, **counts}
+
+
+def iter_json(value: Any, chunk_rows: int = 200) -> Iterator[str]:
+    """Encode value as JSON incrementally (lists are emitted in row chunks)"""
+    if isinstance(value, dict):
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            yield ("," if i else "") + json.dumps(str(key)) + ":"
+            yield from iter_json(item, chunk_rows)
+        yield "}"
+    elif isinstance(value, (list, tuple)):
+        yield "["
+        for start in range(0, len(value), chunk_rows):
+            chunk = jsonable_encoder(list(value[start:start + chunk_rows]))
+            yield ("," if start else "") + json.dumps(chunk)[1:-1]
+        yield "]"
+    else:
+        yield json.dumps(jsonable_encoder(value))
+
+
+_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    """Process-wide store (created lazily inside the running event loop)"""
+    global _store
+    if _store is None:
+        _store = JobStore()
+    return _store
@@ -5,7 +5,7 @@ The @keyword router in main.py routes prompts to specific tools.
 """
 
 from fastmcp import FastMCP
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 # Import tool functions
 from scripts.hello import hello
@@ -16,8 +16,12 @@ from scripts.host_status import (
     check_disk_space_warning, 
     get_process_info
 )
+from scripts.dir_size import DEFAULT_WORKERS, get_directory_sizes
 from scripts.vertica_query import vertica_query
 from scripts.postgres_query import postgres_query
+from scripts.postgres_shards import postgres_shard_query
+from scripts.describe_schema import describe_schema
+from scripts.fleet_status import fleet_status
 from scripts.rest_call import rest_call
 
 
@@ -63,15 +67,44 @@ def get_process_info_tool() -> Dict[str, Any]:
 
 
 @mcp.tool()
-def vertica_query_tool(sql: str, limit: int = 100) -> Dict[str, Any]:
-    """Execute query on Vertica"""
-    return vertica_query(sql, limit)
+def get_directory_sizes_tool(path: str = "/", top_n: int = 10, workers: int = DEFAULT_WORKERS,
+                             one_file_system: bool = True, refresh: bool = False) -> Dict[str, Any]:
+    """Find the largest directories and files under a path (refresh=True ignores the mtime cache)"""
+    return get_directory_sizes(path, int(top_n), int(workers), one_file_system, refresh)
 
 
 @mcp.tool()
-def postgres_query_tool(sql: str, limit: int = 100) -> Dict[str, Any]:
-    """Execute query on PostgreSQL"""
-    return postgres_query(sql, limit)
+def vertica_query_tool(sql: str, limit: int = 100, approx: bool = False,
+                       sample_percent: Optional[float] = None) -> Dict[str, Any]:
+    """Execute query on Vertica (approx=True estimates aggregates from a table sample)"""
+    return vertica_query(sql, limit, approx, sample_percent)
+
+
+@mcp.tool()
+def postgres_query_tool(sql: str, limit: int = 100, approx: bool = False,
+                        sample_percent: Optional[float] = None) -> Dict[str, Any]:
+    """Execute query on PostgreSQL (approx=True estimates aggregates from a table sample)"""
+    return postgres_query(sql, limit, approx, sample_percent)
+
+
+@mcp.tool()
+def postgres_shard_query_tool(sql: str, limit: int = 100) -> Dict[str, Any]:
+    """Execute query on all PostgreSQL shards and merge results"""
+    return postgres_shard_query(sql, limit)
+
+
+@mcp.tool()
+def describe_schema_tool(table: Optional[str] = None, backend: str = "postgres",
+                         refresh: bool = False) -> Dict[str, Any]:
+    """Describe tables, columns, indexes and row estimates (cached catalog)"""
+    return describe_schema(table, backend, refresh)
+
+
+@mcp.tool()
+def fleet_status_tool(metric: str = "disk", threshold: Optional[float] = None,
+                      top_n: int = 10, path: Optional[str] = None) -> Dict[str, Any]:
+    """Rank fleet hosts by disk/cpu/memory/load from cached peer snapshots"""
+    return fleet_status(metric, threshold, top_n, path)
 
 
 @mcp.tool()
@@ -88,8 +121,12 @@ TOOLS = {
     "get_disk_usage": get_disk_usage_tool,
     "check_disk_space_warning": check_disk_space_warning_tool,
     "get_process_info": get_process_info_tool,
+    "get_directory_sizes": get_directory_sizes_tool,
     "vertica_query": vertica_query_tool,
     "postgres_query": postgres_query_tool,
+    "postgres_shard_query": postgres_shard_query_tool,
+    "describe_schema": describe_schema_tool,
+    "fleet_status": fleet_status_tool,
     "rest_call": rest_call_tool,
 }
 
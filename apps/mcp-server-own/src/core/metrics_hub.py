@@ -0,0 +1,143 @@
+"""Shared metric samplers for WebSocket subscribers.
+
+Each metric has at most one sampler task. The task ticks at the smallest
+interval any current subscriber asked for, and each subscriber receives the
+latest sample once its own interval has elapsed. Collection cost therefore
+depends on the number of metrics being watched, not on the number of
+viewers. A sampler stops when its last subscriber leaves.
+
+Subscriber queues hold a single pending sample: a slow client skips ticks
+instead of delaying the others.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from scripts.host_status import get_disk_usage, get_process_info, get_system_resources
+
+METRICS_MIN_INTERVAL = float(os.getenv("METRICS_MIN_INTERVAL", "0.5"))
+METRICS_MAX_INTERVAL = float(os.getenv("METRICS_MAX_INTERVAL", "3600"))
+
+# metric name -> blocking sample function (run in the default executor)
+METRICS: Dict[str, Callable[[], Any]] = {
+    "system_resources": lambda: get_system_resources(cpu_interval=None),
+    "disk_usage": get_disk_usage,
+    "process_info": get_process_info,
+}
+
+
+class Subscription:
+    def __init__(self, metric: str, interval: float):
+        self.metric = metric
+        self.interval = interval
+        self.next_due = 0.0
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.dropped = 0
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        """Deliver a sample, replacing one the client has not consumed yet"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class _Sampler:
+    def __init__(self, metric: str):
+        self.metric = metric
+        self.subscribers: set = set()
+        self.task: Optional[asyncio.Task] = None
+        self.samples = 0
+        self.errors = 0
+        self.last_message: Optional[Dict[str, Any]] = None
+        self.last_started = 0.0
+        self.wakeup = asyncio.Event()
+
+    @property
+    def tick(self) -> float:
+        return min((s.interval for s in self.subscribers), default=METRICS_MIN_INTERVAL)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        sample_func = METRICS[self.metric]
+        while self.subscribers:
+            started = time.monotonic()
+            try:
+                data = await loop.run_in_executor(None, sample_func)
+                message = {"type": "sample", "metric": self.metric, "ts": time.time(), "data": data}
+                self.samples += 1
+            except Exception as e:
+                message = {"type": "error", "metric": self.metric, "message": str(e)}
+                self.errors += 1
+
+            self.last_message, self.last_started = message, started
+            now = time.monotonic()
+            for sub in list(self.subscribers):
+                if now >= sub.next_due:
+                    sub.offer(message)
+                    sub.next_due = started + sub.interval
+
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), max(self.tick - (time.monotonic() - started), 0))
+            except asyncio.TimeoutError:
+                pass
+
+
+class MetricsHub:
+    def __init__(self):
+        self._samplers: Dict[str, _Sampler] = {}
+
+    def subscribe(self, metric: str, interval: float) -> Subscription:
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Available: {', '.join(METRICS)}")
+        interval = min(max(float(interval), METRICS_MIN_INTERVAL), METRICS_MAX_INTERVAL)
+        sub = Subscription(metric, interval)
+        sampler = self._samplers.get(metric)
+        if sampler is None:
+            sampler = self._samplers[metric] = _Sampler(metric)
+        previous_tick = sampler.tick if sampler.subscribers else None
+        sampler.subscribers.add(sub)
+        if sampler.last_message is not None:
+            # Start from the latest sample instead of sampling again
+            sub.offer(sampler.last_message)
+            sub.next_due = sampler.last_started + interval
+        if sampler.task is None or sampler.task.done():
+            sampler.task = asyncio.ensure_future(sampler.run())
+        elif previous_tick is not None and interval < previous_tick:
+            sampler.wakeup.set()  # switch to the shorter tick now
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        sampler = self._samplers.get(sub.metric)
+        if sampler is None:
+            return
+        sampler.subscribers.discard(sub)
+        if not sampler.subscribers:
+            if sampler.task is not None:
+                sampler.task.cancel()
+            del self._samplers[sub.metric]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            metric: {
+                "subscribers": len(sampler.subscribers),
+                "tick_seconds": sampler.tick,
+                "samples": sampler.samples,
+                "errors": sampler.errors,
+            }
+            for metric, sampler in self._samplers.items()
+        }
+
+
+_hub: Optional[MetricsHub] = None
+
+
+def get_metrics_hub() -> MetricsHub:
+    """Process-wide hub (created lazily inside the running event loop)"""
+    global _hub
+    if _hub is None:
+        _hub = MetricsHub()
+    return _hub
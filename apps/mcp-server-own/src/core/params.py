@@ -0,0 +1,16 @@
+"""Coercion for tool flags that may arrive as query-string text.
+
+GET /mcp/{tool} passes every query parameter as a string, so a flag such as
+refresh=false must not be read with plain truthiness.
+"""
+
+from typing import Any
+
+TRUE_STRINGS = ("1", "true", "yes", "on")
+
+
+def is_truthy(flag: Any) -> bool:
+    """True for truthy values and for "1"/"true"/"yes"/"on" in any case"""
+    if isinstance(flag, str):
+        return flag.strip().lower() in TRUE_STRINGS
+    return bool(flag)
@@ -0,0 +1,121 @@
+"""Where each tool runs: inline, thread pool or process pool.
+
+- inline: called directly on the event loop. Only for trivial tools that
+  never block. Deadlines cannot interrupt them.
+- thread: the default executor (the default placement). Suits I/O-bound
+  tools and tools that use progress or cancellation.
+- process: a dedicated ProcessPoolExecutor (PROCESS_POOL_WORKERS) for tools
+  that spend their time in Python holding the GIL (get_process_info parses
+  /proc for every process) and would otherwise delay every other call.
+  Workers are spawned, not forked, so the parent's threads and DB
+  connections are never copied. They import PROCESS_POOL_PRELOAD when they
+  start. Arguments and results cross the process boundary by pickle, so
+  they must be picklable. Progress reports are not forwarded. Cancellation
+  only drops calls that have not started yet; a running call finishes and
+  its result is discarded.
+
+TOOL_PLACEMENT_<TOOL> overrides the placement of a single tool.
+"""
+
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+PLACEMENTS = (INLINE, THREAD, PROCESS)
+
+TOOL_PLACEMENTS = {
+    "hello": INLINE,
+    "get_os_name": INLINE,
+    "get_process_info": PROCESS,
+}
+DEFAULT_PLACEMENT = THREAD
+
+PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+PROCESS_POOL_PRELOAD = [
+    m.strip() for m in os.getenv("PROCESS_POOL_PRELOAD", "core.mcp_runner").split(",") if m.strip()
+]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def tool_placement(tool_name: str) -> str:
+    """Placement for a tool (env override first)"""
+    env = os.getenv(f"TOOL_PLACEMENT_{tool_name.upper()}", "").lower()
+    if env in PLACEMENTS:
+        return env
+    return TOOL_PLACEMENTS.get(tool_name, DEFAULT_PLACEMENT)
+
+
+def _preload(modules) -> None:
+    for name in modules:
+        importlib.import_module(name)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def run_in_process(tool_name: str, args: Dict[str, Any]) -> Tuple[float, float, Any]:
+    """Worker side: run a registered tool, returning (started, finished, result)"""
+    from core.mcp_runner import TOOLS
+
+    started = time.perf_counter()
+    result = TOOLS[tool_name](**args)
+    return started, time.perf_counter(), result
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PROCESS_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_preload,
+                initargs=(PROCESS_POOL_PRELOAD,),
+            )
+        return _pool
+
+
+def reset_process_pool(broken: Optional[ProcessPoolExecutor] = None) -> None:
+    """Drop the pool (e.g. after a worker died) so the next call builds a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or (broken is not None and _pool is not broken):
+            return
+        pool, _pool = _pool, None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def start_process_pool() -> int:
+    """Spawn and preload every worker now instead of on the first call (warm-up)"""
+    if not any(p == PROCESS for p in map(tool_placement, _registered_tools())):
+        return 0
+    pool = get_process_pool()
+    futures = [pool.submit(_ping) for _ in range(PROCESS_POOL_WORKERS)]
+    return len({f.result() for f in futures})
+
+
+def shutdown_process_pool() -> None:
+    reset_process_pool()
+
+
+def _registered_tools():
+    from core.mcp_runner import TOOLS
+
+    return list(TOOLS)
+
+
+def placement_stats() -> Dict[str, Any]:
+    return {
+        "process_pool": {"workers": PROCESS_POOL_WORKERS, "started": _pool is not None},
+        "tools": {name: tool_placement(name) for name in _registered_tools()},
+    }
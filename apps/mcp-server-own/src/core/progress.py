@@ -0,0 +1,105 @@
+"""Per-call tool context: progress reporting and cooperative cancellation.
+
+The gateway runs each tool call inside a ToolContext (see run_with_context).
+Tools report progress and check for cancellation through the module-level
+helpers, which are no-ops when a tool is called outside the gateway:
+
+    from core.progress import report_progress, check_cancelled
+
+    for i, item in enumerate(items):
+        check_cancelled()
+        ...
+        report_progress(i + 1, len(items))
+"""
+
+import contextvars
+import logging
+import threading
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ToolCancelled(Exception):
+    """Raised inside a tool when its call has been cancelled."""
+
+
+class ToolContext:
+    """State shared between the gateway and one running tool call."""
+
+    def __init__(self, on_progress: Optional[Callable[[float, Optional[float], Optional[str]], None]] = None,
+                 timeout: Optional[float] = None):
+        self.on_progress = on_progress
+        # Deadline in seconds overriding the tool's own (e.g. background jobs)
+        self.timeout = timeout
+        self._cancel_event = threading.Event()
+        self._cancel_callbacks: List[Callable[[], Any]] = []
+        # Reentrant: a cancel callback may itself remove a callback
+        self._lock = threading.RLock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def report(self, progress: float, total: Optional[float] = None, message: Optional[str] = None) -> None:
+        if self.on_progress and not self.cancelled:
+            self.on_progress(progress, total, message)
+
+    def add_cancel_callback(self, callback: Callable[[], Any]) -> None:
+        """Register a hook run on cancel (e.g. a DB driver cancel)."""
+        with self._lock:
+            run_now = self.cancelled
+            if not run_now:
+                self._cancel_callbacks.append(callback)
+        if run_now:
+            callback()
+
+    def remove_cancel_callback(self, callback: Callable[[], Any]) -> None:
+        """Deregister a hook; once this returns it is not running and never will"""
+        with self._lock:
+            if callback in self._cancel_callbacks:
+                self._cancel_callbacks.remove(callback)
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._cancel_event.is_set():
+                return
+            self._cancel_event.set()
+            callbacks, self._cancel_callbacks = self._cancel_callbacks, []
+            # Run under the lock so a tool leaving cancel_on_tool_cancel() waits for us:
+            # conn.cancel() must not fire after conn is back in the pool serving another call
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception:
+                    logger.warning("cancel callback failed", exc_info=True)
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("tool_context", default=None)
+
+
+def current_context() -> Optional[ToolContext]:
+    """Return the ToolContext of the running call, if any."""
+    return _current.get()
+
+
+def run_with_context(ctx: ToolContext, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run func with ctx as the current tool context (use from worker threads)."""
+    token = _current.set(ctx)
+    try:
+        check_cancelled()
+        return func(*args, **kwargs)
+    finally:
+        _current.reset(token)
+
+
+def report_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None) -> None:
+    ctx = _current.get()
+    if ctx is not None:
+        ctx.report(progress, total, message)
+
+
+def check_cancelled() -> None:
+    ctx = _current.get()
+    if ctx is not None and ctx.cancelled:
+        raise ToolCancelled("Tool call cancelled")
@@ -0,0 +1,187 @@
+"""Per-tool deadlines and per-dependency circuit breakers.
+
+Deadlines come from TOOL_TIMEOUTS, overridable per tool with
+TOOL_TIMEOUT_<TOOL_NAME> (seconds, e.g. TOOL_TIMEOUT_VERTICA_QUERY=120) and
+globally with TOOL_TIMEOUT_DEFAULT. A ToolContext may carry its own, longer
+deadline (background jobs use JOB_TIMEOUT); call_timeout() returns the one
+in effect. When a deadline passes the call's ToolContext is cancelled; tools
+stop at their next check_cancelled() or via registered cancel callbacks.
+
+Breakers are keyed by dependency (DB DSN, REST host). After
+BREAKER_FAILURE_THRESHOLD consecutive failures a breaker opens and rejects
+calls for BREAKER_RESET_TIMEOUT seconds, then lets one probe call through
+(half-open); the probe's outcome closes or re-opens it. REST hosts are
+arbitrary, so at most BREAKER_MAX_ENTRIES breakers are kept; the least
+recently used closed ones are dropped first.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from core.db import dsn_label
+from core.progress import ToolContext, current_context
+
+TOOL_TIMEOUTS = {
+    "postgres_query": 30.0,
+    "vertica_query": 60.0,
+    "rest_call": 15.0,
+    "get_directory_sizes": 120.0,
+    "postgres_shard_query": 60.0,
+}
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT_DEFAULT", "30"))
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+BREAKER_MAX_ENTRIES = int(os.getenv("BREAKER_MAX_ENTRIES", "256"))
+
+logger = logging.getLogger(__name__)
+
+
+class ToolTimeout(Exception):
+    """The tool did not finish before its deadline."""
+
+
+class CircuitOpen(Exception):
+    """The tool's dependency breaker is open; the call was not attempted."""
+
+
+def tool_timeout(tool_name: str) -> float:
+    """Deadline in seconds for a tool (env override first)"""
+    env = os.getenv(f"TOOL_TIMEOUT_{tool_name.upper()}")
+    if env:
+        return float(env)
+    return TOOL_TIMEOUTS.get(tool_name, DEFAULT_TOOL_TIMEOUT)
+
+
+def call_timeout(tool_name: str, ctx: Optional[ToolContext] = None) -> float:
+    """Deadline for this call: the context's own, else the tool's.
+
+    Tools call it without ctx (from their worker thread) to size server-side
+    limits such as statement_timeout to the same deadline.
+    """
+    ctx = ctx or current_context()
+    if ctx is not None and ctx.timeout:
+        return ctx.timeout
+    return tool_timeout(tool_name)
+
+
+def dependency_key(tool_name: str, args: Dict[str, Any]) -> Optional[str]:
+    """Breaker key for the external dependency a call will hit, if any"""
+    if tool_name == "postgres_query":
+        return "postgres:" + dsn_label(os.getenv("POSTGRES_DSN", ""))
+    if tool_name == "vertica_query":
+        return "vertica:" + dsn_label(os.getenv("VERTICA_DSN", ""))
+    if tool_name == "rest_call":
+        return "rest:" + (urlparse(str(args.get("url", ""))).netloc or "invalid")
+    return None
+
+
+def is_dependency_failure(tool_name: str, result: Any) -> bool:
+    """Whether a returned (not raised) result means the dependency failed"""
+    if not isinstance(result, dict):
+        return False
+    if tool_name == "rest_call":
+        return "error" in result or result.get("status_code", 0) >= 500
+    return False
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpen unless a call may proceed"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._probe_in_flight):
+                self.rejected += 1
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+                raise CircuitOpen(f"Circuit open for {self.name} (retry in {retry_in:.0f}s): {self.last_error}")
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error: str) -> None:
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("circuit breaker %s opened after %d failures: %s",
+                                   self.name, self.failures, error)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Call ended without a verdict (e.g. cancelled by the client)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self.state
+            if state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                state = self.HALF_OPEN
+            return {
+                "state": state,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+            }
+
+
+_breakers: "OrderedDict[str, CircuitBreaker]" = OrderedDict()
+_breakers_lock = threading.Lock()
+
+
+def _evict_breaker() -> None:
+    # Prefer the least recently used closed breaker; an open one still protects its host
+    for key, breaker in _breakers.items():
+        if breaker.state == CircuitBreaker.CLOSED:
+            del _breakers[key]
+            return
+    _breakers.popitem(last=False)
+
+
+def get_breaker(key: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            if len(_breakers) >= BREAKER_MAX_ENTRIES:
+                _evict_breaker()
+            breaker = _breakers[key] = CircuitBreaker(key)
+        else:
+            _breakers.move_to_end(key)
+        return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
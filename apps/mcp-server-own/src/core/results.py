@@ -0,0 +1,179 @@
+"""Shaping of JSON-RPC tools/call results.
+
+A result is returned as structuredContent (JSON) and, for clients that
+predate structured content, as the same JSON in a text block. When the
+encoded result is larger than RESULT_INLINE_MAX_BYTES it is spilled to a
+blob file (RESULT_BLOB_DIR). The response then carries a truncated preview
+whose spill details sit under SPILL_KEY, and a resource_link
+(result://<id>) for protocol 2025-06-18 clients. The full result can be fetched with
+resources/read or GET /results/<id> for RESULT_BLOB_TTL seconds.
+"""
+
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+RESULT_INLINE_MAX_BYTES = int(os.getenv("RESULT_INLINE_MAX_BYTES", str(64 * 1024)))
+RESULT_PREVIEW_ITEMS = int(os.getenv("RESULT_PREVIEW_ITEMS", "20"))
+RESULT_PREVIEW_CHARS = int(os.getenv("RESULT_PREVIEW_CHARS", "1000"))
+RESULT_BLOB_DIR = os.getenv("RESULT_BLOB_DIR", os.path.join(tempfile.gettempdir(), "mcp-results"))
+RESULT_BLOB_TTL = float(os.getenv("RESULT_BLOB_TTL", "900"))
+
+URI_PREFIX = "result://"
+# Key holding spill details in a truncated structuredContent (kept apart from the tool's own keys)
+SPILL_KEY = "_spill"
+
+LATEST_PROTOCOL_VERSION = "2025-06-18"
+
+
+class BlobStore:
+    def __init__(self, root: str = RESULT_BLOB_DIR, ttl: float = RESULT_BLOB_TTL):
+        self.root = root
+        self.ttl = ttl
+        self.spilled = 0
+
+    def _path(self, blob_id: str) -> Optional[str]:
+        if not blob_id.isalnum():
+            return None
+        return os.path.join(self.root, blob_id + ".json")
+
+    def purge(self) -> None:
+        cutoff = time.time() - self.ttl
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def put(self, data: bytes) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        self.purge()
+        blob_id = uuid.uuid4().hex
+        path = self._path(blob_id)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        self.spilled += 1
+        return blob_id
+
+    def open(self, blob_id: str):
+        """Readable binary file for a live blob, or None"""
+        path = self._path(blob_id)
+        if path is None:
+            return None
+        try:
+            if time.time() - os.path.getmtime(path) >= self.ttl:
+                return None
+            return open(path, "rb")
+        except OSError:
+            return None
+
+
+blob_store = BlobStore()
+
+
+def iter_blob(f, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def summarize(tool_name: str, value: Any) -> str:
+    """One-line description of a tool result"""
+    if isinstance(value, dict):
+        if "error" in value:
+            return f"{tool_name}: error: {value['error']}"
+        parts = []
+        for key, item in value.items():
+            if isinstance(item, (list, tuple)):
+                parts.append(f"{key}: {len(item)} items")
+            elif isinstance(item, dict):
+                parts.append(f"{key}: {{{len(item)} keys}}")
+            else:
+                text = str(item)
+                parts.append(f"{key}: {text if len(text) <= 80 else text[:77] + '...'}")
+        return f"{tool_name}: " + "; ".join(parts)
+    if isinstance(value, (list, tuple)):
+        return f"{tool_name}: {len(value)} items"
+    text = str(value)
+    return f"{tool_name}: {text if len(text) <= 200 else text[:197] + '...'}"
+
+
+def preview(value: Any) -> Any:
+    """Copy of value with lists cut to RESULT_PREVIEW_ITEMS and long strings shortened"""
+    if isinstance(value, dict):
+        return {key: preview(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [preview(item) for item in value[:RESULT_PREVIEW_ITEMS]]
+    if isinstance(value, str) and len(value) > RESULT_PREVIEW_CHARS:
+        return value[:RESULT_PREVIEW_CHARS] + "..."
+    return value
+
+
+def build_tool_result(tool_name: str, result: Any, protocol_version: str = LATEST_PROTOCOL_VERSION) -> Dict[str, Any]:
+    """MCP tools/call result: serialized JSON text + structuredContent, spilled if large.
+
+    resource_link content only exists from protocol 2025-06-18; older clients
+    get the result URI in the text block instead.
+    """
+    value = jsonable_encoder(result)
+    structured = value if isinstance(value, dict) else {"result": value}
+    encoded = json.dumps(structured, separators=(",", ":")).encode("utf-8")
+    if len(encoded) <= RESULT_INLINE_MAX_BYTES:
+        # Spec: tools returning structured content should also return it as TextContent
+        return {
+            "content": [{"type": "text", "text": encoded.decode("utf-8")}],
+            "structuredContent": structured,
+        }
+
+    blob_id = blob_store.put(encoded)
+    uri = URI_PREFIX + blob_id
+    partial = {
+        **preview(structured),
+        SPILL_KEY: {
+            "truncated": True,
+            "uri": uri,
+            "url": f"/results/{blob_id}",
+            "bytes": len(encoded),
+        },
+    }
+    content = [
+        {
+            "type": "text",
+            "text": f"{summarize(tool_name, value)} (truncated preview; full result: {len(encoded)} bytes at {uri})",
+        },
+        {"type": "text", "text": json.dumps(partial, separators=(",", ":"))},
+    ]
+    if protocol_version >= "2025-06-18":
+        content.append({
+            "type": "resource_link",
+            "uri": uri,
+            "name": f"{tool_name} result",
+            "mimeType": "application/json",
+            "size": len(encoded),
+        })
+    return {"content": content, "structuredContent": partial}
+
+
+def read_blob_text(uri: str) -> Optional[str]:
+    """Full JSON text of a spilled result (resources/read), or None"""
+    if not uri.startswith(URI_PREFIX):
+        return None
+    f = blob_store.open(uri[len(URI_PREFIX):])
+    if f is None:
+        return None
+    with f:
+        return f.read().decode("utf-8")
@@ -0,0 +1,89 @@
+"""Singleflight: coalesce identical concurrent calls into one execution.
+
+The first caller for a key starts the work; callers arriving while it is in
+flight await the same future and receive the same result (or exception).
+Waiters are shielded from each other: one caller giving up does not cancel
+the shared execution unless it was the last one waiting.
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+def make_key(name: str, args: Dict[str, Any]) -> str:
+    """Build a coalescing key from a tool name and normalized arguments"""
+    normalized = {}
+    for k, v in args.items():
+        if isinstance(v, str):
+            v = v.strip()
+            if k == "sql":
+                v = v.rstrip(";").rstrip()
+        normalized[k] = v
+    return name + ":" + json.dumps(normalized, sort_keys=True, default=str)
+
+
+class _Call:
+    __slots__ = ("future", "waiters", "on_abandon")
+
+    def __init__(self, future: asyncio.Future, on_abandon: Optional[Callable[[], Any]]):
+        self.future = future
+        self.waiters = 0
+        self.on_abandon = on_abandon
+
+
+class SingleFlight:
+    """Per-process registry of in-flight calls (use from one event loop)"""
+
+    def __init__(self):
+        self._inflight: Dict[str, _Call] = {}
+        self.calls = 0
+        self.executions = 0
+        self.merged = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]],
+                 on_abandon: Optional[Callable[[], Any]] = None) -> Any:
+        """Run func() once per key among concurrent callers.
+
+        If every waiter is cancelled before the call finishes, the key is
+        released and on_abandon is invoked (e.g. to cancel the underlying tool).
+        """
+        self.calls += 1
+        call = self._inflight.get(key)
+        if call is None:
+            self.executions += 1
+            call = _Call(asyncio.ensure_future(func()), on_abandon)
+            self._inflight[key] = call
+            call.future.add_done_callback(lambda f: self._finish(key, call))
+        else:
+            self.merged += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.future)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.future.done():
+                # Abandoned: later callers start a fresh execution instead of
+                # joining this one while it is being cancelled
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+                if call.on_abandon:
+                    call.on_abandon()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _finish(self, key: str, call: _Call) -> None:
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every waiter already left
+        if not call.future.cancelled():
+            call.future.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "merged": self.merged,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,168 @@
+"""Sampled slow-request log.
+
+The dispatcher reports every tool call here. A call is kept if it took at
+least SLOWLOG_THRESHOLD_MS, or if it falls in a SLOWLOG_SAMPLE_RATE random
+sample of the other calls. The request path only takes an O(1) result size
+(row or item count, so the queue never holds the result itself) and does a
+put_nowait onto a bounded queue; records are dropped (and counted) when the
+queue is full. A daemon writer thread, started with the app (start()),
+appends JSON lines to a rotating file (SLOWLOG_PATH, SLOWLOG_MAX_BYTES x
+SLOWLOG_BACKUPS). It also keeps the SLOWLOG_TOP_N slowest calls in memory
+for GET /slow-requests. record() never raises: if the file cannot be opened
+only the in-memory list is kept, and records arriving before start() are
+dropped.
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+SLOWLOG_THRESHOLD_MS = float(os.getenv("SLOWLOG_THRESHOLD_MS", "1000"))
+SLOWLOG_SAMPLE_RATE = float(os.getenv("SLOWLOG_SAMPLE_RATE", "0.01"))
+SLOWLOG_PATH = os.getenv("SLOWLOG_PATH", os.path.join("runtime", "slow_requests.jsonl"))
+SLOWLOG_MAX_BYTES = int(os.getenv("SLOWLOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOWLOG_BACKUPS = int(os.getenv("SLOWLOG_BACKUPS", "3"))
+SLOWLOG_QUEUE_SIZE = int(os.getenv("SLOWLOG_QUEUE_SIZE", "1000"))
+SLOWLOG_TOP_N = int(os.getenv("SLOWLOG_TOP_N", "100"))
+
+
+def fingerprint(coalescing_key: str) -> str:
+    """Stable short hash of a call's normalized arguments (no raw SQL/URLs in the log)"""
+    return hashlib.sha1(coalescing_key.encode("utf-8")).hexdigest()[:12]
+
+
+def result_items(result: Any) -> Optional[int]:
+    """Cheap size of a tool result: its row count, else its length"""
+    if isinstance(result, dict) and isinstance(result.get("rows"), list):
+        return len(result["rows"])
+    if isinstance(result, (dict, list, tuple, str)):
+        return len(result)
+    return None
+
+
+class SlowLog:
+    def __init__(self, path: str = SLOWLOG_PATH, threshold_ms: float = SLOWLOG_THRESHOLD_MS,
+                 sample_rate: float = SLOWLOG_SAMPLE_RATE):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self._queue: queue.Queue = queue.Queue(maxsize=SLOWLOG_QUEUE_SIZE)
+        self._worst: List[tuple] = []  # min-heap of (total_ms, seq, entry)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._logger: Optional[logging.Logger] = None
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[str] = None
+        self.counters = {"seen": 0, "slow": 0, "sampled": 0, "dropped": 0, "written": 0}
+
+    def record(self, entry: Dict[str, Any], result: Any = None) -> None:
+        """Hand a finished call to the writer if it is slow or sampled (never blocks or raises)"""
+        try:
+            self.counters["seen"] += 1
+            if entry["total_ms"] >= self.threshold_ms:
+                entry["slow"] = True
+            elif random.random() < self.sample_rate:
+                entry["slow"] = False
+            else:
+                return
+            self.counters["slow" if entry["slow"] else "sampled"] += 1
+            entry["result_items"] = result_items(result)
+            if self._thread is None:  # writer not started yet
+                self.counters["dropped"] += 1
+                return
+            self._queue.put_nowait(entry)
+        except Exception:  # queue.Full, or anything unexpected: never fail the call
+            self.counters["dropped"] += 1
+
+    def start(self) -> None:
+        """Open the log file and start the writer (app startup; safe to call twice)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                handler = RotatingFileHandler(self.path, maxBytes=SLOWLOG_MAX_BYTES,
+                                              backupCount=SLOWLOG_BACKUPS, encoding="utf-8")
+            except OSError as e:
+                self.error = f"cannot open {self.path}: {e}"
+            else:
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger("mcp.slowlog")
+                logger.propagate = False
+                logger.setLevel(logging.INFO)
+                logger.addHandler(handler)
+                self._logger = logger
+            self._thread = threading.Thread(target=self._write_loop, name="slowlog-writer", daemon=True)
+            self._thread.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if self._logger is not None:
+                try:
+                    self._logger.info(json.dumps(entry, default=str))
+                    self.counters["written"] += 1
+                except Exception:
+                    pass
+            if entry["slow"]:
+                with self._lock:
+                    self._seq += 1
+                    item = (entry["total_ms"], self._seq, entry)
+                    if len(self._worst) < SLOWLOG_TOP_N:
+                        heapq.heappush(self._worst, item)
+                    else:
+                        heapq.heappushpop(self._worst, item)
+
+    def worst(self, limit: int = 20, tool: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = [item[2] for item in sorted(self._worst, reverse=True)]
+        if tool:
+            entries = [e for e in entries if e["tool"] == tool]
+        return entries[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "sample_rate": self.sample_rate,
+            "path": self.path,
+            "error": self.error,
+            "queued": self._queue.qsize(),
+            **self.counters,
+        }
+
+
+slowlog = SlowLog()
+
+
+def call_entry(tool_name: str, keyword: Optional[str], key: str, status: str,
+               started: float, timings: Dict[str, float]) -> Dict[str, Any]:
+    """Log record for one call; timings are perf_counter marks from the dispatcher"""
+    finished = time.perf_counter()
+    entry: Dict[str, Any] = {
+        "ts": time.time(),
+        "tool": tool_name,
+        "keyword": keyword,
+        "args_fp": fingerprint(key),
+        "status": status,
+        "total_ms": round((finished - started) * 1000, 1),
+        "coalesced": "submitted" not in timings,
+    }
+    if "submitted" in timings:
+        run_started = timings.get("started")
+        entry["phases_ms"] = {
+            "pre_dispatch": round((timings["submitted"] - started) * 1000, 1),
+            "queue": round((run_started - timings["submitted"]) * 1000, 1) if run_started else None,
+            "execute": round((timings["finished"] - run_started) * 1000, 1)
+            if run_started and "finished" in timings else None,
+        }
+    return entry
@@ -0,0 +1,200 @@
+"""Lightweight SQL clause inspection for the gateway's SQL tools.
+
+Not a full parser: it masks string literals, quoted identifiers, comments
+and parenthesized sub-expressions so clause keywords are only matched at the
+top level of the statement.
+"""
+
+import re
+from decimal import Decimal
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+
+class OrderItem(NamedTuple):
+    expr: str
+    descending: bool
+    nulls_first: bool
+
+
+def mask_sql(sql: str) -> str:
+    """Same-length copy of sql with literals, comments and (...) contents blanked"""
+    out = []
+    depth = 0
+    i = 0
+    n = len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch in ("'", '"'):
+            j = i + 1
+            while j < n:
+                if sql[j] == ch:
+                    if j + 1 < n and sql[j + 1] == ch:  # doubled quote escape
+                        j += 2
+                        continue
+                    break
+                j += 1
+            out.append(" " * (min(j, n - 1) - i + 1))
+            i = j + 1
+            continue
+        if sql.startswith("--", i):
+            j = sql.find("\n", i)
+            j = n if j == -1 else j
+            out.append(" " * (j - i))
+            i = j
+            continue
+        if sql.startswith("/*", i):
+            j = sql.find("*/", i + 2)
+            j = n if j == -1 else j + 2
+            out.append(" " * (j - i))
+            i = j
+            continue
+        if ch == "(":
+            out.append(ch if depth == 0 else " ")
+            depth += 1
+        elif ch == ")":
+            depth = max(0, depth - 1)
+            out.append(ch if depth == 0 else " ")
+        else:
+            out.append(ch if depth == 0 else " ")
+        i += 1
+    return "".join(out)
+
+
+def _split_top_level(text: str, masked: str) -> List[str]:
+    parts, start = [], 0
+    for i, ch in enumerate(masked):
+        if ch == ",":
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def find_clause(sql: str, keyword: str, masked: Optional[str] = None) -> Optional[Tuple[int, int]]:
+    """(start, end) of the last top-level occurrence of keyword (e.g. 'order by')"""
+    masked = masked if masked is not None else mask_sql(sql)
+    pattern = r"\b" + r"\s+".join(keyword.split()) + r"\b"
+    matches = list(re.finditer(pattern, masked, re.IGNORECASE))
+    if not matches:
+        return None
+    return matches[-1].start(), matches[-1].end()
+
+
+def parse_order_by(sql: str) -> List[OrderItem]:
+    """Top-level ORDER BY items (PostgreSQL null ordering defaults)"""
+    masked = mask_sql(sql)
+    clause = find_clause(sql, "order by", masked)
+    if not clause:
+        return []
+    start = clause[1]
+    end = len(sql)
+    tail = re.search(r"\b(limit|offset|fetch|for)\b|;", masked[start:], re.IGNORECASE)
+    if tail:
+        end = start + tail.start()
+
+    items = []
+    for item in _split_top_level(sql[start:end], masked[start:end]):
+        match = re.match(
+            r"^(?P<expr>.*?)(?:\s+(?P<dir>asc|desc))?(?:\s+nulls\s+(?P<nulls>first|last))?$",
+            item, re.IGNORECASE | re.DOTALL,
+        )
+        descending = (match.group("dir") or "").lower() == "desc"
+        nulls = (match.group("nulls") or "").lower()
+        nulls_first = nulls == "first" if nulls else descending
+        items.append(OrderItem(match.group("expr").strip(), descending, nulls_first))
+    return items
+
+
+def parse_limit(sql: str) -> Optional[int]:
+    """Numeric top-level LIMIT, or None"""
+    masked = mask_sql(sql)
+    match = None
+    for match in re.finditer(r"\blimit\s+(\d+)", masked, re.IGNORECASE):
+        pass
+    return int(match.group(1)) if match else None
+
+
+def has_clause(sql: str, keyword: str) -> bool:
+    return find_clause(sql, keyword) is not None
+
+
+_TYPED_LITERAL_PREFIX = re.compile(r"\b(date|time|timestamp|timestamptz|interval)\s*$", re.IGNORECASE)
+_POSITIONAL_CLAUSE = re.compile(r"\b(order|group)\s+by\s*$", re.IGNORECASE)
+_CLAUSE_END = re.compile(r"\b(limit|offset|having|window|fetch|union|intersect|except|for)\s*$", re.IGNORECASE)
+
+
+def parameterize(sql: str) -> Tuple[str, List[Any]]:
+    """Lift string and numeric literals out of sql into $1..$n placeholders.
+
+    Returns (template, params). Literals are left inline where lifting would
+    change meaning: typed literals (DATE '...'), E''/B''/X'' strings and
+    numbers inside ORDER BY / GROUP BY (positional references). Statements
+    with dollar-quoting or existing placeholders are returned unchanged.
+    """
+    if re.search(r"\$\d|\$\w*\$", mask_sql(sql)):
+        return sql, []
+
+    out: List[str] = []
+    params: List[Any] = []
+    depth = 0
+    positional_depth = -1  # paren depth of the ORDER/GROUP BY we are in, -1 if none
+    i = 0
+    n = len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch.isspace():
+            out.append(ch)
+            i += 1
+            continue
+        before = "".join(out[-16:])[-40:]
+        if _POSITIONAL_CLAUSE.search(before):
+            positional_depth = depth
+        elif _CLAUSE_END.search(before):
+            positional_depth = -1
+
+        if sql.startswith("--", i) or sql.startswith("/*", i):
+            end = sql.find("\n", i) if ch == "-" else sql.find("*/", i + 2)
+            end = n if end == -1 else (end if ch == "-" else end + 2)
+            out.append(sql[i:end])
+            i = end
+            continue
+        if ch in ("'", '"'):
+            j = i + 1
+            while j < n:
+                if sql[j] == ch:
+                    if j + 1 < n and sql[j + 1] == ch:
+                        j += 2
+                        continue
+                    break
+                j += 1
+            literal = sql[i:j + 1]
+            if (ch == '"' or j >= n or (before and (before[-1].isalnum() or before[-1] == "_"))
+                    or _TYPED_LITERAL_PREFIX.search(before)):
+                out.append(literal)
+            else:
+                params.append(literal[1:-1].replace("''", "'"))
+                out.append(f"${len(params)}")
+            i = j + 1
+            continue
+        if ch.isdigit() and (i == 0 or not (sql[i - 1].isalnum() or sql[i - 1] in "_.$")):
+            match = re.match(r"\d+(\.\d+)?(e[+-]?\d+)?", sql[i:], re.IGNORECASE)
+            end = i + match.end()
+            if positional_depth >= 0 or (end < n and (sql[end].isalnum() or sql[end] == "_")):
+                out.append(sql[i:end])
+            else:
+                text = match.group(0)
+                params.append(int(text) if text.isdigit() else Decimal(text))
+                out.append(f"${len(params)}")
+            i = end
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth < positional_depth:
+                positional_depth = -1
+        elif ch == ";":
+            positional_depth = -1
+        out.append(ch)
+        i += 1
+    return "".join(out), params
@@ -0,0 +1,133 @@
+"""Startup warm-up and readiness state.
+
+During lifespan startup, warm-up runs steps concurrently in the executor,
+each bounded by WARMUP_STEP_TIMEOUT: importing the tool modules, opening
+minimum DB pool sizes, loading schema catalogs, priming psutil counters,
+spawning the tool process pool, polling fleet peers (which opens their pooled HTTP connections) and any
+steps the app adds, such as pre-rendering tools/list. GET /ready reports
+ready once every step has finished. A failed step is recorded and does not
+block readiness: the first request then simply pays the cold cost.
+"""
+
+import asyncio
+import importlib
+import os
+import pkgutil
+import time
+from typing import Any, Callable, Dict, Optional
+
+import psutil
+
+from core.catalog import BACKENDS, get_catalog
+from core.db import PSYCOPG2_AVAILABLE, VERTICA_AVAILABLE, get_postgres_pool, get_vertica_pool
+from core.fleet import get_fleet
+from core.placement import start_process_pool
+
+WARMUP_STEP_TIMEOUT = float(os.getenv("WARMUP_STEP_TIMEOUT", "30"))
+
+
+class WarmupState:
+    def __init__(self):
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "elapsed_ms": round(((self.finished_at or time.time()) - self.started_at) * 1000, 1)
+            if self.started_at else None,
+            "steps": self.steps,
+        }
+
+
+warmup_state = WarmupState()
+
+
+def import_tool_modules() -> int:
+    import scripts
+
+    names = [f"scripts.{m.name}" for m in pkgutil.iter_modules(scripts.__path__)]
+    for name in names:
+        importlib.import_module(name)
+    return len(names)
+
+
+def fill_db_pools() -> Dict[str, int]:
+    opened = {}
+    if PSYCOPG2_AVAILABLE:
+        for dsn in filter(None, [os.getenv("POSTGRES_DSN")]):
+            pool = get_postgres_pool(dsn)
+            opened[pool.name] = pool.fill()
+    if VERTICA_AVAILABLE:
+        for dsn in filter(None, [os.getenv("VERTICA_DSN")]):
+            pool = get_vertica_pool(dsn)
+            opened[pool.name] = pool.fill()
+    return opened
+
+
+def load_schema_catalogs() -> Dict[str, int]:
+    loaded = {}
+    for backend in BACKENDS:
+        catalog = get_catalog(backend)
+        if catalog is not None:
+            loaded[backend] = len(catalog.snapshot())
+    return loaded
+
+
+def prime_psutil() -> int:
+    # cpu_percent(None) measures from the previous call; process_iter caches Process objects
+    psutil.cpu_percent(interval=None)
+    psutil.cpu_percent(interval=None, percpu=True)
+    return sum(1 for _ in psutil.process_iter(["pid", "name", "memory_percent"]))
+
+
+def default_steps() -> Dict[str, Callable[[], Any]]:
+    return {
+        "tool_modules": import_tool_modules,
+        "db_pools": fill_db_pools,
+        "schema_catalogs": load_schema_catalogs,
+        "psutil": prime_psutil,
+        "process_pool": start_process_pool,
+    }
+
+
+async def _run_step(name: str, func: Callable[[], Any]) -> None:
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    record: Dict[str, Any] = {"ok": False}
+    try:
+        record["detail"] = await asyncio.wait_for(loop.run_in_executor(None, func), WARMUP_STEP_TIMEOUT)
+        record["ok"] = True
+    except asyncio.TimeoutError:
+        record["error"] = f"timed out after {WARMUP_STEP_TIMEOUT}s"
+    except Exception as e:
+        record["error"] = str(e)
+    record["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    warmup_state.steps[name] = record
+
+
+async def _poll_fleet() -> None:
+    fleet = get_fleet()
+    if fleet is None:
+        return
+    started = time.perf_counter()
+    await fleet.poll_all()
+    warmup_state.steps["fleet"] = {
+        "ok": True,
+        "detail": sum(1 for s in fleet.peers.values() if s.snapshot is not None),
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def run_warmup(extra_steps: Optional[Dict[str, Callable[[], Any]]] = None) -> Dict[str, Any]:
+    """Run all warm-up steps concurrently, then mark the gateway ready"""
+    warmup_state.started_at = time.time()
+    steps = {**default_steps(), **(extra_steps or {})}
+    await asyncio.gather(_poll_fleet(), *(_run_step(name, func) for name, func in steps.items()))
+    warmup_state.finished_at = time.time()
+    return warmup_state.snapshot()
@@ -0,0 +1,68 @@
+"""Schema introspection tool backed by the in-memory catalog cache."""
+
+import fnmatch
+from typing import Any, Dict, Optional
+
+from core.catalog import BACKENDS, get_catalog
+from core.params import is_truthy
+
+BACKEND_ALIASES = {"postgres": "postgres", "psql": "postgres", "pg": "postgres", "vertica": "vertica"}
+
+
+def describe_schema(table: Optional[str] = None, backend: str = "postgres",
+                    refresh: bool = False) -> Dict[str, Any]:
+    """Describe tables, columns, types, indexes and row estimates.
+
+    Args:
+        table: Table name, schema.table, or a glob (e.g. "sales.*"); omit to list all tables
+        backend: "postgres" or "vertica"
+        refresh: Reload the catalog in the background; this answer still comes
+            from the current snapshot
+
+    Returns:
+        dict: Table list or table details, or error
+    """
+    backend = BACKEND_ALIASES.get(str(backend).lower(), str(backend).lower())
+    if backend not in BACKENDS:
+        return {"error": f"Unknown backend '{backend}'. Available: {', '.join(BACKENDS)}"}
+    catalog = get_catalog(backend)
+    if catalog is None:
+        return {"backend": backend, "error": f"{BACKENDS[backend][0]} is not configured"}
+
+    try:
+        tables = catalog.snapshot()
+    except Exception as e:
+        return {"backend": backend, "error": f"Catalog load failed: {e}"}
+
+    meta = {"backend": backend, "catalog_age_seconds": catalog.stats()["age_seconds"]}
+    if is_truthy(refresh):
+        # Reloading takes several catalog queries; keep them off the request path
+        catalog.invalidate()
+        meta["refresh_pending"] = True
+    if catalog.last_error:
+        meta["stale"] = True
+        meta["last_error"] = catalog.last_error
+
+    if not table:
+        return {
+            **meta,
+            "count": len(tables),
+            "tables": [
+                {"name": name, "columns": len(info["columns"]), "row_estimate": info["row_estimate"]}
+                for name, info in sorted(tables.items())
+            ],
+        }
+
+    pattern = table.strip().lower()
+    matches = [
+        info for name, info in sorted(tables.items())
+        if fnmatch.fnmatchcase(name.lower(), pattern) or fnmatch.fnmatchcase(info["table"].lower(), pattern)
+    ]
+    if not matches:
+        return {**meta, "table": table, "error": f"No table matches '{table}'"}
+    return {**meta, "count": len(matches), "tables": matches}
+
+
+if __name__ == '__main__':
+    result = describe_schema()
+    print(result)
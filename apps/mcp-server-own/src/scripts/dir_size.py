@@ -0,0 +1,212 @@
+"""Directory size analyzer tool (du-style).
+
+Walks a tree with os.scandir across a thread pool and reports the largest
+directories and files. Per-directory results are cached on disk keyed by
+(st_dev, st_ino, st_mtime_ns): a directory whose entry list has not changed
+is not re-listed, so repeat scans of a mostly unchanged tree only pay one
+stat() per directory. The cache keeps the DIRSIZE_CACHE_MAX_ENTRIES most
+recently scanned directories and is only rewritten when a scan changed it.
+
+Note: growing a file in place does not change its parent directory's mtime,
+so such changes are only picked up with refresh=True (or once the directory
+itself changes).
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from core.params import is_truthy
+from core.progress import check_cancelled, current_context, report_progress
+
+CACHE_PATH = os.getenv("DIRSIZE_CACHE_PATH", "runtime/dirsize_cache.json")
+CACHE_MAX_ENTRIES = int(os.getenv("DIRSIZE_CACHE_MAX_ENTRIES", "50000"))
+CACHE_VERSION = 1
+# Largest files remembered per directory; top_n above this forces a rescan
+CACHE_TOP_FILES = 50
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+logger = logging.getLogger(__name__)
+
+_cache: Optional[Dict[str, Dict[str, Any]]] = None
+_cache_lock = threading.Lock()
+
+
+def _load_cache() -> Dict[str, Dict[str, Any]]:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                with open(CACHE_PATH, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                _cache = data.get("dirs", {}) if data.get("version") == CACHE_VERSION else {}
+            except (OSError, ValueError):
+                _cache = {}
+        return _cache
+
+
+def _save_cache(cache: Dict[str, Dict[str, Any]]) -> None:
+    directory = os.path.dirname(CACHE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{CACHE_PATH}.{os.getpid()}.tmp"
+    with _cache_lock:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "dirs": cache}, f)
+        os.replace(tmp_path, CACHE_PATH)
+
+
+def _scan_dir(path: str, cached: Optional[Dict[str, Any]], top_files: int,
+              root_dev: Optional[int]) -> Tuple[Dict[str, Any], bool]:
+    """Scan one directory (non-recursive). Returns (entry, reused_from_cache)."""
+    try:
+        st = os.lstat(path)
+    except OSError as e:
+        return {"error": str(e), "files_bytes": 0, "file_count": 0, "top_files": [], "subdirs": []}, False
+
+    if (cached and "error" not in cached
+            and cached["dev"] == st.st_dev
+            and cached["ino"] == st.st_ino
+            and cached["mtime_ns"] == st.st_mtime_ns
+            and len(cached["top_files"]) >= min(top_files, cached["file_count"])):
+        return cached, True
+
+    files_bytes = 0
+    file_count = 0
+    files: List[Tuple[int, str]] = []
+    subdirs: List[str] = []
+    entry = {"dev": st.st_dev, "ino": st.st_ino, "mtime_ns": st.st_mtime_ns}
+    try:
+        with os.scandir(path) as it:
+            for item in it:
+                try:
+                    if item.is_dir(follow_symlinks=False):
+                        if root_dev is None or item.stat(follow_symlinks=False).st_dev == root_dev:
+                            subdirs.append(item.name)
+                    elif item.is_file(follow_symlinks=False):
+                        size = item.stat(follow_symlinks=False).st_size
+                        files_bytes += size
+                        file_count += 1
+                        files.append((size, item.name))
+                except OSError:
+                    continue
+    except OSError as e:
+        entry["error"] = str(e)
+
+    entry.update({
+        "files_bytes": files_bytes,
+        "file_count": file_count,
+        "top_files": heapq.nlargest(max(top_files, CACHE_TOP_FILES), files),
+        "subdirs": subdirs,
+    })
+    return entry, False
+
+
+def get_directory_sizes(path: str = "/", top_n: int = 10, workers: int = DEFAULT_WORKERS,
+                        one_file_system: bool = True, refresh: bool = False) -> Dict[str, Any]:
+    """Find the largest directories and files under a path.
+
+    Args:
+        path: Root directory to analyze
+        top_n: Number of directories and files to return
+        workers: Size of the scandir worker pool
+        one_file_system: Do not descend into other mounted filesystems (like du -x)
+        refresh: Ignore the mtime cache and re-list every directory
+
+    Returns:
+        dict: Total size plus top-N directories and files (bytes)
+    """
+    started = time.perf_counter()
+    top_n = max(1, int(top_n))
+    root = os.path.abspath(path)
+    if not os.path.isdir(root):
+        return {"path": path, "error": f"Not a directory: {path}"}
+
+    cache = _load_cache()
+    root_dev = os.lstat(root).st_dev if is_truthy(one_file_system) else None
+    refresh = is_truthy(refresh)
+    scanned: Dict[str, Dict[str, Any]] = {}
+    depth_order: List[str] = []
+    reused = 0
+    errors = 0
+    # Context vars do not follow into pool threads, so workers poll the context directly
+    ctx = current_context()
+
+    def scan(directory: str) -> Tuple[Dict[str, Any], bool]:
+        if ctx is not None and ctx.cancelled:
+            return {"files_bytes": 0, "file_count": 0, "top_files": [], "subdirs": []}, False
+        return _scan_dir(directory, None if refresh else cache.get(directory), top_n, root_dev)
+
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+        frontier = [root]
+        while frontier:
+            results = pool.map(scan, frontier)
+            next_frontier = []
+            for directory, (entry, was_cached) in zip(frontier, results):
+                scanned[directory] = entry
+                depth_order.append(directory)
+                reused += was_cached
+                errors += "error" in entry
+                next_frontier.extend(os.path.join(directory, name) for name in entry["subdirs"])
+            check_cancelled()
+            report_progress(len(scanned), None, f"{len(scanned)} directories scanned")
+            frontier = next_frontier
+
+    # Aggregate bottom-up: children always appear after their parent in BFS order
+    totals: Dict[str, int] = {}
+    for directory in reversed(depth_order):
+        entry = scanned[directory]
+        totals[directory] = entry["files_bytes"] + sum(
+            totals.get(os.path.join(directory, name), 0) for name in entry["subdirs"]
+        )
+
+    top_dirs = heapq.nlargest(top_n, totals.items(), key=lambda item: item[1])
+    top_files = heapq.nlargest(
+        top_n,
+        ((size, os.path.join(directory, name))
+         for directory, entry in scanned.items()
+         for size, name in entry["top_files"]),
+    )
+
+    # Drop stale entries below root (deleted directories), keep the rest of the cache.
+    # Re-inserting the scanned entries keeps the dict in least-recently-scanned order.
+    prefix = root.rstrip(os.sep) + os.sep
+    with _cache_lock:
+        stale = [k for k in cache if (k == root or k.startswith(prefix)) and k not in scanned]
+        for key in stale:
+            del cache[key]
+        for key, entry in scanned.items():
+            cache.pop(key, None)
+            cache[key] = entry
+        evicted = max(0, len(cache) - CACHE_MAX_ENTRIES)
+        for key in list(itertools.islice(cache, evicted)):
+            del cache[key]
+    if stale or evicted or reused < len(scanned):
+        try:
+            _save_cache(cache)
+        except OSError:
+            logger.warning("failed to save dirsize cache to %s", CACHE_PATH, exc_info=True)
+
+    return {
+        "path": root,
+        "total_bytes": totals[root],
+        "dirs_scanned": len(scanned) - reused,
+        "dirs_cached": reused,
+        "files": sum(entry["file_count"] for entry in scanned.values()),
+        "errors": errors,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "top_dirs": [{"path": d, "bytes": size} for d, size in top_dirs],
+        "top_files": [{"path": p, "bytes": size} for size, p in top_files],
+    }
+
+
+if __name__ == '__main__':
+    import sys
+    result = get_directory_sizes(sys.argv[1] if len(sys.argv) > 1 else ".")
+    print(json.dumps(result, indent=2))
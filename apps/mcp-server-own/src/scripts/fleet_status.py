@@ -0,0 +1,37 @@
+"""Fleet-wide host status from the aggregator's cached peer snapshots."""
+
+from typing import Any, Dict, Optional
+
+from core.fleet import get_fleet
+
+
+def fleet_status(metric: str = "disk", threshold: Optional[float] = None,
+                 top_n: int = 10, path: Optional[str] = None) -> Dict[str, Any]:
+    """Rank fleet hosts by a metric.
+
+    Args:
+        metric: "disk", "cpu", "memory" or "load"
+        threshold: Only hosts with metric >= threshold
+        top_n: Max hosts to return
+        path: Disk path to compare (default: fullest reported disk)
+
+    Returns:
+        dict: Ranked hosts and unreachable peers, or error
+    """
+    fleet = get_fleet()
+    if fleet is None:
+        return {"error": "Fleet mode is off (FLEET_PEERS is not configured)"}
+    try:
+        return fleet.query(
+            str(metric).lower(),
+            float(threshold) if threshold not in (None, "") else None,
+            int(top_n),
+            path,
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+if __name__ == '__main__':
+    result = fleet_status()
+    print(result)
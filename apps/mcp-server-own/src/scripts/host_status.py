@@ -1,15 +1,9 @@
-from fastmcp import tool
-import psutil
-import platform
-import os
-
-@tool
 """Host and system status tools."""
 
 import psutil
 import platform
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence
 
 
 def get_os_name() -> Dict[str, str]:
@@ -21,14 +15,19 @@ def get_os_name() -> Dict[str, str]:
     }
 
 
-def get_system_resources() -> Dict[str, Any]:
-    """Get CPU, memory, and load information."""
+def get_system_resources(cpu_interval: Optional[float] = 1) -> Dict[str, Any]:
+    """Get CPU, memory, and load information.
+
+    cpu_interval=None measures CPU since the previous call instead of
+    blocking for a fresh interval (used by the shared metrics sampler).
+    """
+    memory = psutil.virtual_memory()
     return {
-        "cpu_percent": psutil.cpu_percent(interval=1),
+        "cpu_percent": psutil.cpu_percent(interval=cpu_interval),
         "memory": {
-            "total": psutil.virtual_memory().total,
-            "used": psutil.virtual_memory().used,
-            "percent": psutil.virtual_memory().percent,
+            "total": memory.total,
+            "used": memory.used,
+            "percent": memory.percent,
         },
         "loadavg": os.getloadavg(),
     }
@@ -57,6 +56,25 @@ def check_disk_space_warning(path: str = "/") -> Dict[str, Any]:
     }
 
 
+def get_host_snapshot(paths: Sequence[str] = ("/",)) -> Dict[str, Any]:
+    """Compact non-blocking host summary (polled by fleet aggregators)."""
+    resources = get_system_resources(cpu_interval=None)
+    disks = []
+    for path in paths:
+        try:
+            disk_info = psutil.disk_usage(path)
+        except OSError:
+            continue
+        disks.append({"path": path, "percent": disk_info.percent, "free": disk_info.free, "total": disk_info.total})
+    return {
+        "hostname": platform.node(),
+        "cpu_percent": resources["cpu_percent"],
+        "memory_percent": resources["memory"]["percent"],
+        "loadavg": resources["loadavg"],
+        "disks": disks,
+    }
+
+
 def get_process_info() -> Dict[str, Any]:
     """Get list of running processes."""
     processes = []
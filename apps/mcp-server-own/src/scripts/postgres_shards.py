@@ -0,0 +1,280 @@
+"""PostgreSQL multi-shard fan-out query tool.
+
+Runs one guarded SELECT on every DSN in POSTGRES_SHARD_DSNS concurrently.
+Each shard streams rows through a server-side cursor. With a top-level
+ORDER BY the (already sorted) shard streams are combined by a heap-based
+k-way merge; otherwise rows are taken in arrival order. Once the global
+LIMIT is satisfied every shard cursor is closed and still-running shard
+queries are cancelled. Each shard statement runs under a statement_timeout
+matching the tool deadline.
+
+Limitations: OFFSET is rejected (it cannot be applied per shard), ORDER BY
+items must be selected columns/aliases or positions, and aggregates are
+returned per shard rather than re-combined.
+"""
+
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.db import connect_postgres, dsn_label, postgres_shard_dsns
+from core.progress import check_cancelled, current_context
+from core.query_guard import guard_sql
+from core.resilience import CircuitOpen, call_timeout, get_breaker
+from core.sql_parse import has_clause, parse_limit, parse_order_by
+
+FETCH_SIZE = int(os.getenv("SHARD_FETCH_SIZE", "500"))
+
+
+class _Reversed:
+    """Inverts comparisons for DESC sort keys"""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _column_index(expr: str, columns: List[str]) -> int:
+    if expr.isdigit() and 1 <= int(expr) <= len(columns):
+        return int(expr) - 1
+    name = expr.split(".")[-1].strip().strip('"').lower()
+    lowered = [c.lower() for c in columns]
+    if name in lowered:
+        return lowered.index(name)
+    raise ValueError(f"ORDER BY {expr} must be a selected column, alias or position to merge shard results")
+
+
+def _sort_key(order_items, columns: List[str]):
+    spec = [(_column_index(item.expr, columns), item.descending, item.nulls_first) for item in order_items]
+
+    def key(row):
+        parts = []
+        for index, descending, nulls_first in spec:
+            value = row[index]
+            null_rank = (value is None) != nulls_first
+            parts.append((null_rank, _Reversed(value) if descending else value))
+        return tuple(parts)
+    return key
+
+
+class _ShardFanout:
+    """Runs the shard queries and routes their row batches to per-shard buffers"""
+
+    def __init__(self, dsns: List[str], sql: str, statement_timeout_ms: int):
+        self.dsns = dsns
+        self.sql = sql
+        self.statement_timeout_ms = statement_timeout_ms
+        self.stop = threading.Event()
+        self.messages: queue.Queue = queue.Queue(maxsize=4 * len(dsns))
+        self.buffers = [deque() for _ in dsns]
+        self.finished = [False] * len(dsns)
+        self.fetched = [0] * len(dsns)
+        self.elapsed_ms: List[Optional[float]] = [None] * len(dsns)
+        self.errors: Dict[int, str] = {}
+        self.columns: Optional[List[str]] = None
+        self._connections: Dict[int, Any] = {}
+        self._running: set = set()
+        self._lock = threading.Lock()
+
+    def _put(self, message) -> None:
+        while not self.stop.is_set():
+            try:
+                self.messages.put(message, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def run_shard(self, index: int) -> None:
+        dsn = self.dsns[index]
+        breaker = get_breaker("postgres:" + dsn_label(dsn))
+        started = time.perf_counter()
+        try:
+            breaker.before_call()
+        except CircuitOpen as e:
+            self._put((index, "error", str(e)))
+            return
+
+        conn = None
+        try:
+            conn = connect_postgres(dsn)
+            with self._lock:
+                self._connections[index] = conn
+                self._running.add(index)
+            if self.stop.is_set():
+                return
+            with conn.cursor() as setup:
+                setup.execute(f"SET statement_timeout = {self.statement_timeout_ms}")
+            cursor = conn.cursor(name=f"mcp_shard_{index}")
+            cursor.itersize = FETCH_SIZE
+            cursor.execute(self.sql)
+            sent_columns = False
+            while not self.stop.is_set():
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not sent_columns:
+                    self._put((index, "columns", [d[0] for d in cursor.description]))
+                    sent_columns = True
+                if not rows:
+                    break
+                self._put((index, "rows", rows))
+            breaker.record_success()
+            self.elapsed_ms[index] = round((time.perf_counter() - started) * 1000, 1)
+            self._put((index, "done", None))
+        except Exception as e:
+            if self.stop.is_set():
+                breaker.release()
+            else:
+                breaker.record_failure(str(e))
+                self._put((index, "error", str(e)))
+        finally:
+            with self._lock:
+                self._running.discard(index)
+                self._connections.pop(index, None)
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def shutdown(self) -> None:
+        """Stop all shards; cancel queries still executing on the server"""
+        self.stop.set()
+        with self._lock:
+            running = [self._connections[i] for i in self._running if i in self._connections]
+        for conn in running:
+            try:
+                conn.cancel()
+            except Exception:
+                pass
+
+    def pump(self) -> None:
+        """Receive one message from a shard worker"""
+        while True:
+            check_cancelled()
+            try:
+                index, kind, payload = self.messages.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        if kind == "columns":
+            if self.columns is None:
+                self.columns = payload
+        elif kind == "rows":
+            self.buffers[index].extend(payload)
+            self.fetched[index] += len(payload)
+        else:
+            if kind == "error":
+                self.errors[index] = payload
+            self.finished[index] = True
+
+    def shard_stream(self, index: int) -> Iterator[tuple]:
+        buffer = self.buffers[index]
+        while True:
+            while not buffer:
+                if self.finished[index]:
+                    return
+                self.pump()
+            yield buffer.popleft()
+
+    def arrival_stream(self) -> Iterator[tuple]:
+        while True:
+            for buffer in self.buffers:
+                while buffer:
+                    yield buffer.popleft()
+            if all(self.finished):
+                return
+            self.pump()
+
+
+def postgres_shard_query(sql: str, limit: int = 100) -> Dict[str, Any]:
+    """Execute a SELECT on every configured PostgreSQL shard and merge the rows.
+
+    Args:
+        sql: SQL query string (SELECT only)
+        limit: Max rows to return across all shards
+
+    Returns:
+        dict: Merged rows, columns and per-shard stats, or error
+    """
+    if not sql or not sql.strip():
+        return {"error": "SQL query is empty"}
+    dsns = postgres_shard_dsns()
+    if not dsns:
+        return {"query": sql, "error": "POSTGRES_SHARD_DSNS is not configured"}
+
+    limit = int(limit)
+    try:
+        guarded = guard_sql(sql, max_limit=limit)
+        if has_clause(guarded, "offset"):
+            raise ValueError("OFFSET is not supported for shard queries")
+    except ValueError as e:
+        return {"query": sql, "error": str(e)}
+
+    global_limit = min(parse_limit(guarded) or limit, limit)
+    order_items = parse_order_by(guarded)
+    fanout = _ShardFanout(dsns, guarded, int(call_timeout("postgres_shard_query") * 1000))
+    ctx = current_context()
+    if ctx is not None:
+        ctx.add_cancel_callback(fanout.shutdown)
+
+    pool = ThreadPoolExecutor(max_workers=len(dsns), thread_name_prefix="shard")
+    try:
+        for index in range(len(dsns)):
+            pool.submit(fanout.run_shard, index)
+
+        if order_items:
+            while fanout.columns is None and not all(fanout.finished):
+                fanout.pump()
+            if fanout.columns is None:
+                stream = iter(())
+            else:
+                stream = heapq.merge(
+                    *(fanout.shard_stream(i) for i in range(len(dsns))),
+                    key=_sort_key(order_items, fanout.columns),
+                )
+        else:
+            stream = fanout.arrival_stream()
+        rows = [list(row) for row in itertools.islice(stream, global_limit)]
+    except ValueError as e:
+        return {"query": guarded, "error": str(e)}
+    finally:
+        fanout.shutdown()
+        pool.shutdown(wait=True)
+        if ctx is not None:
+            ctx.remove_cancel_callback(fanout.shutdown)
+
+    return {
+        "query": guarded,
+        "shards": len(dsns),
+        "ordered": bool(order_items),
+        "limit": global_limit,
+        "columns": fanout.columns or [],
+        "count": len(rows),
+        "rows": rows,
+        "partial": bool(fanout.errors),
+        "shard_stats": [
+            {
+                "shard": dsn_label(dsn),
+                "rows_fetched": fanout.fetched[i],
+                "elapsed_ms": fanout.elapsed_ms[i],
+                **({"error": fanout.errors[i]} if i in fanout.errors else {}),
+            }
+            for i, dsn in enumerate(dsns)
+        ],
+    }
+
+
+if __name__ == '__main__':
+    result = postgres_shard_query("SELECT 1 AS one ORDER BY one")
+    print(result)
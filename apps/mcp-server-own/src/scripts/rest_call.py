@@ -1,12 +1,16 @@
 """REST API call tool."""
 
-import requests
 from typing import Dict, Any
 
+from core import http_cache
+
 
 def rest_call(url: str, method: str = 'GET', timeout: int = 10) -> Dict[str, Any]:
     """Make a REST API call.
     
+    GET responses go through the HTTP cache (Cache-Control / ETag /
+    Last-Modified); "cache" reports hit, revalidated, miss or bypass.
+    
     Args:
         url: Target URL
         method: HTTP method (GET, POST, etc.)
@@ -16,12 +20,13 @@ def rest_call(url: str, method: str = 'GET', timeout: int = 10) -> Dict[str, Any
         dict: Response status and text
     """
     try:
-        resp = requests.request(method, url, timeout=timeout)
+        status_code, text, cache_status = http_cache.request(method, url, float(timeout))
         return {
             "url": url,
             "method": method,
-            "status_code": resp.status_code,
-            "text": resp.text[:500]  # Truncate for brevity
+            "status_code": status_code,
+            "text": text[:500],  # Truncate for brevity
+            "cache": cache_status,
         }
     except Exception as e:
         return {
@@ -33,4 +38,3 @@ def rest_call(url: str, method: str = 'GET', timeout: int = 10) -> Dict[str, Any
 if __name__ == '__main__':
     result = rest_call('https://httpbin.org/get')
     print(result)
-
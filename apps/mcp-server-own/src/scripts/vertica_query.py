@@ -1,30 +1,70 @@
 """Vertica database query tool."""
 
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional
 
+from core import approx as approx_mode
+from core.db import VERTICA_AVAILABLE, is_connection_error, run_vertica_query
+from core.params import is_truthy
+from core.progress import ToolCancelled
+from core.query_guard import guard_sql
+from core.resilience import call_timeout
 
-def vertica_query(sql: str, limit: int = 100) -> Dict[str, Any]:
+
+def vertica_query(sql: str, limit: int = 100, approx: bool = False,
+                  sample_percent: Optional[float] = None) -> Dict[str, Any]:
     """Execute a query against Vertica database.
     
     Args:
         sql: SQL query string
         limit: Max rows to return
+        approx: Estimate eligible aggregates from a TABLESAMPLE of the table
+        sample_percent: Sample size for approx mode (default APPROX_SAMPLE_PERCENT)
     
     Returns:
         dict: Query result or error
     """
-    # TODO: Implement actual Vertica connection using vertica-python
-    # For now, return stub result
     if not sql or not sql.strip():
         return {"error": "SQL query is empty"}
-    
-    return {
-        "query": sql,
+
+    dsn = os.getenv("VERTICA_DSN")
+    if not dsn:
+        return {"query": sql, "error": "VERTICA_DSN is not configured"}
+    if not VERTICA_AVAILABLE:
+        return {"query": sql, "error": "vertica-python is not installed (pip install vertica-python)"}
+
+    limit = int(limit)
+    try:
+        guarded = guard_sql(sql, max_limit=limit)
+    except ValueError as e:
+        return {"query": sql, "error": str(e)}
+
+    plan, approx_info = None, None
+    if is_truthy(approx):
+        guarded, plan, approx_info = approx_mode.prepare(guarded, sample_percent, "vertica")
+
+    try:
+        result = run_vertica_query(dsn, guarded, limit,
+                                   runtime_cap_seconds=call_timeout("vertica_query"))
+    except ToolCancelled:
+        raise
+    except Exception as e:
+        # Connection-level failures propagate so the circuit breaker sees them
+        if is_connection_error(e) or isinstance(e, TimeoutError):
+            raise
+        return {"query": guarded, "error": str(e)}
+    approx_mode.finalize(plan, approx_info, result)
+
+    response = {
+        "query": guarded,
         "limit": limit,
-        "status": "stub - implement actual Vertica connection",
-        "count": 0,
-        "rows": []
+        "count": len(result["rows"]),
+        "columns": result["columns"],
+        "rows": result["rows"],
     }
+    if approx_info is not None:
+        response["approx"] = approx_info
+    return response
 
 
 if __name__ == '__main__':
@@ -0,0 +1,31 @@
+import math
+
+from core.approx import HIDDEN_PREFIX, Z_95, plan_approx, scale_result
+
+
+def test_sum_of_squares_is_computed_in_double_precision():
+    plan, reason = plan_approx("SELECT region, SUM(amount), AVG(amount) FROM orders GROUP BY region", 10)
+    assert reason is None
+    squared = "CAST(amount AS DOUBLE PRECISION) * CAST(amount AS DOUBLE PRECISION)"
+    assert f"SUM({squared}) AS {HIDDEN_PREFIX}0" in plan.sql
+    assert f"COUNT(amount) AS {HIDDEN_PREFIX}1" in plan.sql
+    assert "(amount) * (amount)" not in plan.sql
+    assert plan.hidden == 2
+
+
+def test_scale_result_with_large_integers():
+    plan, _ = plan_approx("SELECT SUM(amount), AVG(amount) FROM orders", 10, dialect="vertica")
+    # Values near the int4 limit; their squares only fit in a float
+    big = 2_000_000_000
+    n = 1000
+    total = big * n
+    sum_sq = float(big) * float(big) * n
+    result = scale_result(plan, ["sum", "avg", "h0", "h1"], [[total, big, sum_sq, n]])
+
+    assert result["columns"] == ["sum", "avg"]
+    estimate_sum, estimate_avg = result["rows"][0]
+    assert estimate_sum == total * 10
+    assert estimate_avg == big
+    margin_sum, margin_avg = result["margins"][0]
+    assert math.isclose(margin_sum, Z_95 * math.sqrt(0.9 * sum_sq) / 0.1)
+    assert margin_avg == 0.0
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+from core import jobs
+from core.jobs import CANCELLED, CANCELLING, SUCCEEDED, JobStore
+
+
+def _blocking_tool(release: threading.Event):
+    """call_tool stand-in for a tool that never checks for cancellation"""
+    async def call_tool(tool_name, args, ctx=None, keyword=None):
+        await asyncio.get_running_loop().run_in_executor(None, release.wait)
+        return {"rows": [1, 2, 3]}
+    return call_tool
+
+
+async def _wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_cancel_running_job_drops_result(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(jobs, "call_tool", _blocking_tool(release))
+
+    async def scenario():
+        store = JobStore()
+        job = store.submit("postgres_query", {"sql": "SELECT 1"})
+        await _wait_for(lambda: job.started_at is not None)
+
+        cancelled = store.cancel(job.id)
+        assert cancelled.status == CANCELLING
+        assert cancelled.summary()["cancel_requested_at"] is not None
+        assert job.ctx.cancelled
+
+        release.set()
+        await _wait_for(lambda: job.finished)
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == CANCELLED
+    assert job.result is None
+    assert job.error is None
+
+
+def test_running_job_without_cancel_succeeds(monkeypatch):
+    release = threading.Event()
+    release.set()
+    monkeypatch.setattr(jobs, "call_tool", _blocking_tool(release))
+
+    async def scenario():
+        job = JobStore().submit("postgres_query", {"sql": "SELECT 1"})
+        await _wait_for(lambda: job.finished)
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == SUCCEEDED
+    assert job.result == {"rows": [1, 2, 3]}
@@ -0,0 +1,34 @@
+import asyncio
+
+from core.singleflight import SingleFlight
+
+
+def test_abandoned_call_is_not_joined():
+    async def scenario():
+        sf = SingleFlight()
+        abandoned = asyncio.Event()
+        started = []
+
+        async def work():
+            started.append(len(started))
+            if len(started) == 1:
+                # First execution only finishes (as cancelled) after a later caller arrives
+                await abandoned.wait()
+                await asyncio.sleep(0.05)
+                raise asyncio.CancelledError()
+            return "fresh"
+
+        first = asyncio.ensure_future(sf.do("k", work, on_abandon=abandoned.set))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        assert abandoned.is_set()
+
+        result = await sf.do("k", work)
+        return result, started, sf.stats()
+
+    result, started, stats = asyncio.run(scenario())
+    assert result == "fresh"
+    assert started == [0, 1]
+    assert stats["executions"] == 2
+    assert stats["in_flight"] == 0
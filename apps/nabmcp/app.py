@@ -3,12 +3,18 @@ import os
 import json
 import subprocess
 import glob
+import hashlib
+import queue
+import threading
+import time
 from typing import List, Dict, Any, Union
+from collections import OrderedDict
 from contextlib import AsyncExitStack
 import gradio as gr
 from gradio.components.chatbot import ChatMessage
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+import httpx
 import requests
 from dotenv import load_dotenv
 
@@ -23,41 +29,252 @@ OLLAMA_HOST = "http://172.21.32.1:11434"
 OLLAMA_MODEL =  "llama3:latest"
 OLLAMA_TIMEOUT = 3000  # 5 minutes default
 
-# Event loop setup
+# MCP server connection: spawn + initialize + list_tools, per server
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "30"))
+# Tool calls: per-call timeout and max concurrent calls per server session
+MCP_TOOL_TIMEOUT = float(os.getenv("MCP_TOOL_TIMEOUT", "60"))
+MCP_SESSION_CONCURRENCY = int(os.getenv("MCP_SESSION_CONCURRENCY", "4"))
+
+# Tool result cache. Servers declare a TTL per tool with the cacheTtlSeconds
+# annotation; TOOL_CACHE_TTLS ("tool=seconds,...") overrides it, 0 disables
+TOOL_CACHE_TTLS = {
+    name.strip(): float(ttl)
+    for name, _, ttl in (item.partition("=") for item in os.getenv("TOOL_CACHE_TTLS", "").split(","))
+    if name.strip() and ttl.strip()
+}
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "256"))
+
+# Pooled async HTTP client for Ollama
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "10"))
+OLLAMA_KEEPALIVE = float(os.getenv("OLLAMA_KEEPALIVE", "300"))  # seconds an idle connection is kept
+
+# Conversation context sent to Ollama (approximate tokens)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "4"))  # recent turns kept verbatim
+CONTEXT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "300"))  # rolling summary of older turns
+CONTEXT_SYSTEM_TOKENS = int(os.getenv("CONTEXT_SYSTEM_TOKENS", "800"))  # system prompt incl. the tool list
+TOOL_RESULT_MAX_TOKENS = int(os.getenv("TOOL_RESULT_MAX_TOKENS", "400"))  # per tool output
+CHARS_PER_TOKEN = 4  # rough average for English text with llama-family tokenizers
+
+# Gradio: chat requests served in parallel, and how many may wait
+GRADIO_CONCURRENCY = int(os.getenv("GRADIO_CONCURRENCY", "8"))
+GRADIO_QUEUE_SIZE = int(os.getenv("GRADIO_QUEUE_SIZE", "64"))
+
+# Event loop setup: one long-lived loop on a dedicated thread owns every MCP
+# session and the Ollama client; Gradio handlers run on worker threads and
+# submit coroutines to it, so concurrent chats interleave instead of colliding
 loop = asyncio.new_event_loop()
-asyncio.set_event_loop(loop)
+loop_thread = threading.Thread(target=loop.run_forever, name="mcp-event-loop", daemon=True)
+loop_thread.start()
+
+
+def run_async(coro):
+    """Run a coroutine on the background event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (no tokenizer round trip to Ollama)"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens (as counted by count_tokens), noting how much was dropped"""
+    max_chars = max(max_tokens, 0) * CHARS_PER_TOKEN - 1
+    if len(text) <= max_chars:
+        return text
+    # The note counts against the limit; its width is bounded by len(text)
+    keep = max_chars - len(f"\n... [truncated {len(text)} characters]")
+    if keep <= 0:
+        return text[:max(max_chars, 0)]
+    return text[:keep] + f"\n... [truncated {len(text) - keep} characters]"
+
+
+class ConversationContext:
+    """Fits each turn's Ollama messages into CONTEXT_TOKEN_BUDGET.
+
+    The last CONTEXT_KEEP_TURNS turns are sent verbatim (fewer if they do not
+    fit). Older turns are folded into a rolling summary appended to the system
+    prompt. Summaries are cached by the turns they cover, so each turn is
+    folded in once, on top of the previous summary, instead of re-summarizing
+    the whole history every time.
+
+    The budget is a hard limit on count_tokens over all messages: the system
+    prompt (tool list) is cut to CONTEXT_SYSTEM_TOKENS and the current message
+    to whatever room is left. CONTEXT_SYSTEM_TOKENS + CONTEXT_SUMMARY_TOKENS
+    must stay well below CONTEXT_TOKEN_BUDGET to leave the question room.
+    """
+
+    def __init__(self, summarize, max_cached: int = 128):
+        self.summarize = summarize  # async (previous summary, turns) -> summary
+        self.summaries = OrderedDict()  # digest of covered turns -> summary
+        self.max_cached = max_cached
+
+    @staticmethod
+    def _turns(history: List[Dict[str, Any]]) -> List[List[Dict[str, str]]]:
+        turns = []
+        for msg in history:
+            role = msg.get("role")
+            content = msg.get("content")
+            if role not in ["user", "assistant"] or not content:
+                continue
+            if role == "user" or not turns:
+                turns.append([])
+            turns[-1].append({"role": role, "content": content})
+        return turns
+
+    @staticmethod
+    def _tokens(messages: List[Dict[str, str]]) -> int:
+        return sum(count_tokens(m["content"]) for m in messages)
+
+    async def _summary(self, turns: List[List[Dict[str, str]]]) -> str:
+        digests = []
+        digest = hashlib.sha1()
+        for turn in turns:
+            for m in turn:
+                digest.update(f"{m['role']}:{m['content']}\0".encode("utf-8"))
+            digests.append(digest.hexdigest())
+
+        if digests[-1] in self.summaries:
+            self.summaries.move_to_end(digests[-1])
+            return self.summaries[digests[-1]]
+
+        # Fold the new turns into the longest already-summarized prefix
+        previous, start = "", 0
+        for n in range(len(turns) - 1, 0, -1):
+            if digests[n - 1] in self.summaries:
+                previous, start = self.summaries[digests[n - 1]], n
+                break
+        summary = trim_to_tokens(await self.summarize(previous, turns[start:]), CONTEXT_SUMMARY_TOKENS)
+
+        self.summaries[digests[-1]] = summary
+        while len(self.summaries) > self.max_cached:
+            self.summaries.popitem(last=False)
+        return summary
+
+    async def build(self, system_msg: str, history: List[Dict[str, Any]], current: str) -> List[Dict[str, str]]:
+        """Messages for this turn: system (+ summary), recent turns, current message"""
+        system_msg = trim_to_tokens(system_msg, CONTEXT_SYSTEM_TOKENS)
+        turns = self._turns(history)
+        keep = turns[-CONTEXT_KEEP_TURNS:] if CONTEXT_KEEP_TURNS > 0 else []
+        older = turns[:len(turns) - len(keep)]
+
+        summary_header = "\n\nSummary of the earlier conversation:\n"
+        summary_room = count_tokens(summary_header) + CONTEXT_SUMMARY_TOKENS if turns else 0
+        fixed = count_tokens(system_msg) + count_tokens(current) + summary_room
+        while keep and fixed + sum(self._tokens(t) for t in keep) > CONTEXT_TOKEN_BUDGET:
+            older.append(keep.pop(0))
+
+        if older:
+            system_msg += summary_header + await self._summary(older)
+
+        messages = [{"role": "system", "content": system_msg}]
+        for turn in keep:
+            messages.extend(turn)
+
+        # Whatever room is left goes to the current message (question + tool results)
+        room = CONTEXT_TOKEN_BUDGET - self._tokens(messages)
+        messages.append({"role": "user", "content": trim_to_tokens(current, room)})
+        return messages
+
 
 class MCPClientWrapper:
     def __init__(self):
         self.sessions = {}  # Multiple sessions for different servers
-        self.exit_stacks = {}  # Multiple exit stacks
+        self.connections = {}  # server name -> (owner task, stop event)
         self.all_tools = []  # Combined tools from all servers
         self.server_tools = {}  # Tools organized by server
+        self.session_limits = {}  # server name -> semaphore bounding concurrent tool calls
+        self.tool_cache = OrderedDict()  # (server, tool, arguments) -> (stored at, expires at, text)
+        self.ollama_client = None  # httpx.AsyncClient, created on first use
+        self.active_streams = {}  # Gradio session hash -> futures of replies being generated
+        self.streams_lock = threading.Lock()
+        self.context = ConversationContext(self._summarize_turns)
 
     def connect_multiple_servers(self, server_directory: str = "server") -> str:
         """Connect to multiple MCP servers in the specified directory"""
-        return loop.run_until_complete(self._connect_multiple_servers(server_directory))
+        return run_async(self._connect_multiple_servers(server_directory))
+
+    def _server_params(self, server_path: str) -> StdioServerParameters:
+        return StdioServerParameters(
+            command="python" if server_path.endswith('.py') else "node",
+            args=[server_path],
+            env={
+                "PYTHONIOENCODING": "utf-8",
+                "PYTHONUNBUFFERED": "1"
+            }
+        )
+
+    async def _hold_connection(self, server_path: str, ready: asyncio.Future, stop: asyncio.Event):
+        """Open a server's transport and session, publish them on `ready`, keep them until `stop` is set.
+
+        The contexts are entered and exited in this one task, as the stdio
+        transport's task group requires.
+        """
+        try:
+            async with AsyncExitStack() as exit_stack:
+                stdio_transport = await exit_stack.enter_async_context(
+                    stdio_client(self._server_params(server_path))
+                )
+                session = await exit_stack.enter_async_context(
+                    ClientSession(stdio_transport[0], stdio_transport[1])
+                )
+                await session.initialize()
+                tools_response = await session.list_tools()
+                ready.set_result((session, tools_response.tools))
+                await stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+
+    async def _open_server(self, server_path: str) -> tuple:
+        """Spawn, initialize and list one server within MCP_CONNECT_TIMEOUT.
+
+        Returns (session, tools, latency in seconds).
+        """
+        started = time.perf_counter()
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.ensure_future(self._hold_connection(server_path, ready, stop))
+        try:
+            session, tools = await asyncio.wait_for(asyncio.shield(ready), MCP_CONNECT_TIMEOUT)
+        except asyncio.TimeoutError:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise TimeoutError(f"timed out after {MCP_CONNECT_TIMEOUT}s")
+        except BaseException:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+        self.connections[os.path.basename(server_path)] = (task, stop)
+        return session, tools, time.perf_counter() - started
+
+    async def _close_all(self):
+        """Shut down every server connection and forget its tools"""
+        tasks = []
+        for task, stop in self.connections.values():
+            stop.set()
+            tasks.append(task)
+        await asyncio.gather(*tasks, return_exceptions=True)
 
-    async def _connect_multiple_servers(self, server_directory: str) -> str:
-        """Asynchronously connect to multiple MCP servers"""
-        # Clean up existing connections
-        for exit_stack in self.exit_stacks.values():
-            if exit_stack:
-                await exit_stack.aclose()
-        
         self.sessions.clear()
-        self.exit_stacks.clear()
+        self.connections.clear()
+        self.session_limits.clear()
+        self.tool_cache.clear()
         self.all_tools.clear()
         self.server_tools.clear()
 
-        # Find all Python files in the server directory
-        import glob
-        import os
+    async def _connect_multiple_servers(self, server_directory: str) -> str:
+        """Asynchronously connect to multiple MCP servers, all at once"""
+        # Clean up existing connections
+        await self._close_all()
+
         print(server_directory)
         if not os.path.exists(server_directory):
             return f"❌ Server directory '{server_directory}' not found."
         
-        server_files = glob.glob(os.path.join(server_directory, "*.py"))
+        server_files = sorted(glob.glob(os.path.join(server_directory, "*.py")))
         
         if not server_files:
             return f"❌ No Python files found in '{server_directory}' directory."
@@ -65,54 +282,29 @@ class MCPClientWrapper:
         connected_servers = []
         failed_servers = []
 
-        for server_path in server_files:
-            server_name = os.path.basename(server_path)
-            
-            try:
-                # Create exit stack for this server
-                exit_stack = AsyncExitStack()
-                self.exit_stacks[server_name] = exit_stack
-
-                server_params = StdioServerParameters(
-                    command="python",
-                    args=[server_path],
-                    env={
-                        "PYTHONIOENCODING": "utf-8",
-                        "PYTHONUNBUFFERED": "1"
-                    }
-                )
+        # Spawn + initialize + list_tools for every server concurrently;
+        # total time is that of the slowest server, not the sum
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(self._open_server(server_path) for server_path in server_files),
+            return_exceptions=True
+        )
+        total_ms = (time.perf_counter() - started) * 1000
 
-                stdio_transport = await exit_stack.enter_async_context(
-                    stdio_client(server_params)
-                )
+        for server_path, outcome in zip(server_files, outcomes):
+            server_name = os.path.basename(server_path)
 
-                session = await exit_stack.enter_async_context(
-                    ClientSession(stdio_transport[0], stdio_transport[1])
-                )
+            if isinstance(outcome, BaseException):
+                failed_servers.append(f"  ❌ {server_name}: {str(outcome)}")
+                continue
 
-                await session.initialize()
+            session, server_tools, latency = outcome
+            self.sessions[server_name] = session
+            self.server_tools[server_name] = server_tools
+            self.all_tools.extend(server_tools)
 
-                # Get tools for this server
-                tools_response = await session.list_tools()
-                server_tools = tools_response.tools
-
-                # Store session and tools
-                self.sessions[server_name] = session
-                self.server_tools[server_name] = server_tools
-                self.all_tools.extend(server_tools)
-
-                tool_names = [tool.name for tool in server_tools]
-                connected_servers.append(f"  📁 {server_name}: {', '.join(tool_names)}")
-
-            except Exception as e:
-                failed_servers.append(f"  ❌ {server_name}: {str(e)}")
-                # Clean up failed connection
-                if server_name in self.exit_stacks:
-                    try:
-                        await self.exit_stacks[server_name].aclose()
-                    except:
-                        pass
-                    del self.exit_stacks[server_name]
+            tool_names = [tool.name for tool in server_tools]
+            connected_servers.append(f"  📁 {server_name} ({latency * 1000:.0f} ms): {', '.join(tool_names)}")
 
         # Build result message
         result_parts = []
@@ -121,6 +313,7 @@ class MCPClientWrapper:
             result_parts.append("✅ Successfully connected to MCP servers:")
             result_parts.extend(connected_servers)
             result_parts.append(f"\n📊 Total tools available: {len(self.all_tools)}")
+            result_parts.append(f"⏱️ Connected in {total_ms:.0f} ms")
         
         if failed_servers:
             result_parts.append("\n⚠️ Failed to connect to some servers:")
@@ -138,69 +331,56 @@ class MCPClientWrapper:
             return self.connect_multiple_servers(server_path.rstrip("/"))
         else:
             # Single server connection
-            return loop.run_until_complete(self._connect_single_server(server_path))
+            return run_async(self._connect_single_server(server_path))
 
     async def _connect_single_server(self, server_path: str) -> str:
         """Connect to a single MCP server"""
         # Clean up existing connections
-        for exit_stack in self.exit_stacks.values():
-            if exit_stack:
-                await exit_stack.aclose()
-        
-        self.sessions.clear()
-        self.exit_stacks.clear()
-        self.all_tools.clear()
-        self.server_tools.clear()
+        await self._close_all()
 
         server_name = os.path.basename(server_path)
         
         try:
-            exit_stack = AsyncExitStack()
-            self.exit_stacks[server_name] = exit_stack
-
-            is_python = server_path.endswith('.py')
-            command = "python" if is_python else "node"
-            
-            server_params = StdioServerParameters(
-                command=command,
-                args=[server_path],
-                env={
-                    "PYTHONIOENCODING": "utf-8",
-                    "PYTHONUNBUFFERED": "1"
-                }
-            )
-
-            stdio_transport = await exit_stack.enter_async_context(
-                stdio_client(server_params)
-            )
-
-            session = await exit_stack.enter_async_context(
-                ClientSession(stdio_transport[0], stdio_transport[1])
-            )
-
-            await session.initialize()
-
-            # Get available tools
-            tools_response = await session.list_tools()
-            tools = tools_response.tools
+            session, tools, latency = await self._open_server(server_path)
 
             self.sessions[server_name] = session
             self.server_tools[server_name] = tools
-            self.all_tools = tools
+            self.all_tools = list(tools)
 
             tool_names = [tool.name for tool in tools]
-            return f"✅ Connected to MCP server successfully.\nServer: {server_name}\nAvailable tools: {', '.join(tool_names)}"
+            return f"✅ Connected to MCP server successfully ({latency * 1000:.0f} ms).\nServer: {server_name}\nAvailable tools: {', '.join(tool_names)}"
 
         except Exception as e:
             return f"❌ Connection error: {str(e)}"
 
-    def call_ollama(self, messages: List[Dict[str, str]]) -> str:
-        """Call Ollama to generate response with progress indication"""
+    async def _get_ollama_client(self) -> httpx.AsyncClient:
+        """Shared async client; keeps connections to OLLAMA_HOST alive between requests"""
+        if self.ollama_client is None:
+            self.ollama_client = httpx.AsyncClient(
+                base_url=OLLAMA_HOST,
+                # The read timeout applies to the wait for each streamed chunk
+                timeout=httpx.Timeout(OLLAMA_TIMEOUT, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=OLLAMA_MAX_CONNECTIONS,
+                    max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+                    keepalive_expiry=OLLAMA_KEEPALIVE
+                ),
+                headers={'Content-Type': 'application/json'}
+            )
+        return self.ollama_client
+
+    async def stream_ollama(self, messages: List[Dict[str, str]], stats: Dict[str, Any]):
+        """Stream the Ollama reply piece by piece as it is generated.
+
+        Fills `stats` with time to first token, token count and tokens/s.
+        Closing the generator (e.g. the user pressed Stop) closes the HTTP
+        stream, which makes Ollama stop generating.
+        """
         try:
             payload = {
                 "model": OLLAMA_MODEL,
                 "messages": messages,
-                "stream": False,
+                "stream": True,
                 "options": {
                     "temperature": 0.7,
                     "top_p": 0.9
@@ -210,55 +390,120 @@ class MCPClientWrapper:
             print(f"🤖 Calling Ollama at {OLLAMA_HOST} with model {OLLAMA_MODEL}")
             print(f"⏱️  Timeout set to {OLLAMA_TIMEOUT} seconds")
             
-            # Use a longer timeout for remote Ollama servers
-            response = requests.post(
-                f"{OLLAMA_HOST}/api/chat",
-                #f"{OLLAMA_HOST}/v1/chat/completions",
-                json=payload,
-                timeout=OLLAMA_TIMEOUT,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Connection': 'keep-alive'
-                }
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result.get("message", {}).get("content", "Failed to get response.")
+            client = await self._get_ollama_client()
+            started = time.perf_counter()
+            chunks = 0
+            async with client.stream("POST", "/api/chat", json=payload) as response:
+                response.raise_for_status()
+                
+                # Read to the end of the body (past "done") so the connection returns to the pool
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        yield f"📡 Ollama error: {chunk['error']}"
+                        return
+                    
+                    content = chunk.get("message", {}).get("content", "")
+                    if content:
+                        chunks += 1
+                        if "ttft" not in stats:
+                            stats["ttft"] = time.perf_counter() - started
+                        yield content
+                    
+                    if chunk.get("done"):
+                        stats["tokens"] = chunk.get("eval_count") or chunks
+                        if chunk.get("eval_count") and chunk.get("eval_duration"):
+                            stats["tokens_per_s"] = chunk["eval_count"] / (chunk["eval_duration"] / 1e9)
+                        elif "ttft" in stats and chunks > 1:
+                            stats["tokens_per_s"] = (chunks - 1) / (time.perf_counter() - started - stats["ttft"])
             
-            print(f"✅ Ollama response received ({len(content)} characters)")
-            return content
+            stats["total"] = time.perf_counter() - started
+            print(f"✅ Ollama response streamed ({stats.get('tokens', 0)} tokens in {stats['total']:.1f}s)")
             
-        except requests.exceptions.Timeout as e:
+        except httpx.TimeoutException as e:
             error_msg = f"⏰ Ollama response timeout after {OLLAMA_TIMEOUT} seconds. The model might be processing a complex request or the server is under heavy load. Please try again or consider using a smaller model."
             print(f"❌ Timeout error: {e}")
-            return error_msg
+            yield error_msg
             
-        except requests.exceptions.ConnectionError as e:
+        except httpx.ConnectError as e:
             error_msg = f"🔌 Cannot connect to Ollama at {OLLAMA_HOST}. Please check if Ollama is running and accessible."
             print(f"❌ Connection error: {e}")
-            return error_msg
+            yield error_msg
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             error_msg = f"📡 Communication error with Ollama: {str(e)}"
             print(f"❌ Request error: {e}")
-            return error_msg
+            yield error_msg
             
         except Exception as e:
             error_msg = f"💥 Unexpected error occurred: {str(e)}"
             print(f"❌ Unexpected error: {e}")
-            return error_msg
+            yield error_msg
+
+    def _stream_in_background(self, messages: List[Dict[str, str]], stats: Dict[str, Any]):
+        """Run stream_ollama as a task on the event loop, feeding a thread-safe queue.
+
+        Returns (future, pieces). `pieces` gets each reply piece, then None once
+        the stream has ended or the task was cancelled. Cancelling `future`
+        from any thread cancels the task, even while it is waiting on Ollama.
+        """
+        pieces = queue.Queue()
 
-    def process_message(self, message: str, history: List[List[str]]) -> tuple:
-        """Process message and generate response"""
+        async def pump():
+            stream = self.stream_ollama(messages, stats)
+            try:
+                async for piece in stream:
+                    pieces.put(piece)
+            finally:
+                await stream.aclose()
+
+        future = asyncio.run_coroutine_threadsafe(pump(), loop)
+        # Fires on completion and on cancel (even before the task started)
+        future.add_done_callback(lambda _: pieces.put(None))
+        return future, pieces
+
+    def stop_generation(self, request: gr.Request = None):
+        """Stop button: cancel the replies being generated for this browser session"""
+        session = request.session_hash if request else None
+        with self.streams_lock:
+            futures = list(self.active_streams.get(session, ()))
+        for future in futures:
+            future.cancel()
+
+    @staticmethod
+    def format_stats(stats: Dict[str, Any]) -> str:
+        """One-line generation summary for the UI"""
+        parts = []
+        if "tools" in stats:
+            parts.append(f"🛠️ Tools: {stats['tools']:.2f}s")
+        if "prompt_tokens" in stats:
+            parts.append(f"📝 Prompt: ~{stats['prompt_tokens']} tokens")
+        if "ttft" in stats:
+            parts.append(f"⚡ First token: {stats['ttft']:.2f}s")
+        if "tokens_per_s" in stats:
+            parts.append(f"🚀 {stats['tokens_per_s']:.1f} tokens/s")
+        if "tokens" in stats:
+            parts.append(f"🔢 {stats['tokens']} tokens")
+        return " · ".join(parts)
+
+    def process_message(self, message: str, history: List[List[str]], request: gr.Request = None):
+        """Process message and stream the response into the chat.
+
+        Yields (history, message box, stats) updates for Gradio.
+        """
         if not self.sessions:
             # Return in [user_message, assistant_message] format
             new_history = history + [[message, "Please connect to MCP server(s) first."]]
-            return new_history, ""
+            yield new_history, "", ""
+            return
 
         # Show processing message immediately
         processing_history = history + [[message, "🤖 Processing your request... This may take a moment for complex queries."]]
+        yield processing_history, "", ""
         
+        stats = {}
         try:
             # Convert history to internal format for processing
             internal_history = []
@@ -267,41 +512,87 @@ class MCPClientWrapper:
                     internal_history.append({"role": "user", "content": chat_pair[0]})
                     internal_history.append({"role": "assistant", "content": chat_pair[1]})
 
-            new_messages = loop.run_until_complete(self._process_query(message, internal_history))
-            
-            # Extract assistant response
-            assistant_response = new_messages[0]["content"] if new_messages else "Sorry, I couldn't generate a response."
+            started = time.perf_counter()
+            ollama_messages = run_async(self._process_query(message, internal_history))
+            stats["tools"] = time.perf_counter() - started
+            stats["prompt_tokens"] = sum(count_tokens(m["content"]) for m in ollama_messages)
             
             # Return in Gradio chatbot format: [[user_msg, assistant_msg], ...]
-            new_history = history + [[message, assistant_response]]
-            return new_history, ""
+            assistant_response = ""
+            # Stop cancels the loop-side task (stop_generation), which wakes this
+            # thread even if it is blocked waiting for Ollama's next token
+            session = request.session_hash if request else None
+            future, pieces = self._stream_in_background(ollama_messages, stats)
+            with self.streams_lock:
+                self.active_streams.setdefault(session, set()).add(future)
+            try:
+                while True:
+                    piece = pieces.get()
+                    if piece is None:
+                        break
+                    assistant_response += piece
+                    yield history + [[message, assistant_response]], "", self.format_stats(stats)
+            finally:
+                # Also runs when Gradio closes this generator
+                future.cancel()
+                with self.streams_lock:
+                    streams = self.active_streams.get(session, set())
+                    streams.discard(future)
+                    if not streams:
+                        self.active_streams.pop(session, None)
+            
+            if not assistant_response:
+                assistant_response = "Sorry, I couldn't generate a response."
+            yield history + [[message, assistant_response]], "", self.format_stats(stats)
             
         except Exception as e:
             error_response = f"❌ Error processing your request: {str(e)}"
             new_history = history + [[message, error_response]]
-            return new_history, ""
+            yield new_history, "", self.format_stats(stats)
 
-    async def _process_query(self, message: str, history: List[Dict[str, Any]]):
-        """Asynchronously process query"""
-        # Convert history to Ollama message format
-        ollama_messages = []
-        
-        # Add system message with all available tools
+    async def _summarize_turns(self, previous: str, turns: List[List[Dict[str, str]]]) -> str:
+        """Fold conversation turns into the running summary with a short Ollama call"""
+        transcript = "\n".join(
+            f"{m['role']}: {trim_to_tokens(m['content'], CONTEXT_SUMMARY_TOKENS)}" for turn in turns for m in turn
+        )
+        prompt = (
+            f"Current summary of the conversation:\n{previous or '(empty)'}\n\n"
+            f"New messages:\n{transcript}\n\n"
+            f"Update the summary to cover the new messages. Keep facts, numbers and open questions. "
+            f"Answer with the summary only, in under {CONTEXT_SUMMARY_TOKENS * 3 // 4} words."
+        )
+        try:
+            client = await self._get_ollama_client()
+            response = await client.post("/api/chat", json={
+                "model": OLLAMA_MODEL,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": False,
+                "options": {"temperature": 0.2}
+            })
+            response.raise_for_status()
+            summary = response.json().get("message", {}).get("content", "").strip()
+            if summary:
+                return summary
+        except Exception as e:
+            print(f"⚠️  Summarizing earlier turns failed, keeping their openings instead: {e}")
+        # Fallback: previous summary plus the start of each user question
+        questions = "; ".join(m["content"][:120] for turn in turns for m in turn if m["role"] == "user")
+        return f"{previous}\nEarlier the user asked: {questions}".strip()
+
+    async def _process_query(self, message: str, history: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Asynchronously build the Ollama messages, running tools if needed.
+
+        The result is fitted into CONTEXT_TOKEN_BUDGET by self.context.
+        """
+        # System message listing the tools (first line of each description only)
+        tool_lines = []
+        for tool in self.all_tools:
+            description = (tool.description or "").strip()
+            tool_lines.append(f"{tool.name}: {description.splitlines()[0] if description else ''}")
         system_msg = """You are a helpful AI assistant. Use available tools when necessary.
-Available tools: """ + ", ".join([f"{tool.name}: {tool.description}" for tool in self.all_tools])
-        
-        ollama_messages.append({"role": "system", "content": system_msg})
+Available tools: """ + ", ".join(tool_lines)
         
-        # Add conversation history
-        for msg in history:
-            role = msg.get("role")
-            content = msg.get("content")
-            
-            if role in ["user", "assistant"] and content:
-                ollama_messages.append({"role": role, "content": content})
-
-        # Add current message
-        ollama_messages.append({"role": "user", "content": message})
+        current = message
 
         # Check if tools are needed (simple heuristic)
         tools_needed = await self._check_if_tools_needed(message)
@@ -310,13 +601,9 @@ Available tools: """ + ", ".join([f"{tool.name}: {tool.description}" for tool in
             # Execute tools
             tool_results = await self._execute_tools(message)
             if tool_results:
-                enhanced_message = f"{message}\n\nTool execution results:\n{tool_results}"
-                ollama_messages[-1]["content"] = enhanced_message
+                current = f"{message}\n\nTool execution results:\n{tool_results}"
 
-        # Generate response with Ollama
-        response = self.call_ollama(ollama_messages)
-        
-        return [{"role": "assistant", "content": response}]
+        return await self.context.build(system_msg, history, current)
 
     async def _check_if_tools_needed(self, message: str) -> bool:
         """Check if message requires tools"""
@@ -334,75 +621,121 @@ Available tools: """ + ", ".join([f"{tool.name}: {tool.description}" for tool in
                 return True
         return False
 
-    async def _execute_tools(self, message: str) -> str:
-        """Execute appropriate tools from all connected servers"""
-        results = []
+    def _select_tool_calls(self, message: str) -> List[tuple]:
+        """Pick the (server_name, tool_name, arguments) calls a message needs, in server/tool order"""
+        calls = []
         message_lower = message.lower()
         
         # Iterate through all servers and their tools
-        for server_name, session in self.sessions.items():
+        for server_name in self.sessions:
             server_tools = self.server_tools.get(server_name, [])
             
             for tool in server_tools:
-                try:
-                    tool_executed = False
-                    
-                    # Disk-related tools
-                    if ("disk" in tool.name.lower() and 
-                        any(keyword in message_lower for keyword in ["disk", "space", "usage", "storage", "capacity", "free"])):
-                        
-                        result = await session.call_tool(tool.name, {})
-                        results.append(f"[{server_name}] {tool.name}: {result.content[0].text if result.content else 'No result'}")
-                        tool_executed = True
-                        
-                    # OS and system-related tools
-                    elif (("os" in tool.name.lower() or "system" in tool.name.lower() or "process" in tool.name.lower()) and 
-                          any(keyword in message_lower for keyword in ["os", "operating", "system", "platform", "version", "cpu", "memory", "process", "rhel", "resource", "uptime"])):
-                        
-                        result = await session.call_tool(tool.name, {})
-                        results.append(f"[{server_name}] {tool.name}: {result.content[0].text if result.content else 'No result'}")
-                        tool_executed = True
+                # Disk-related tools
+                if ("disk" in tool.name.lower() and 
+                    any(keyword in message_lower for keyword in ["disk", "space", "usage", "storage", "capacity", "free"])):
+                    calls.append((server_name, tool.name, {}))
                     
-                    # RHEL-specific tools
-                    elif ("rhel" in tool.name.lower() and 
-                          any(keyword in message_lower for keyword in ["rhel", "red hat", "linux", "version", "release"])):
-                        
-                        result = await session.call_tool(tool.name, {})
-                        results.append(f"[{server_name}] {tool.name}: {result.content[0].text if result.content else 'No result'}")
-                        tool_executed = True
-                    
-                    # RAG-related tools
-                    elif (("rag" in tool.name.lower() or "search" in tool.name.lower() or "answer" in tool.name.lower()) and 
-                          any(keyword in message_lower for keyword in ["search", "find", "document", "rag", "knowledge", "information", "lookup", "query", "answer", "question"])):
-                        
-                        # For RAG search and answer tools, pass the message as query/question
-                        if "search" in tool.name.lower():
-                            result = await session.call_tool(tool.name, {"query": message})
-                        elif "answer" in tool.name.lower():
-                            result = await session.call_tool(tool.name, {"question": message})
-                        else:
-                            result = await session.call_tool(tool.name, {})
-                        
-                        results.append(f"[{server_name}] {tool.name}: {result.content[0].text if result.content else 'No result'}")
-                        tool_executed = True
-                    
-                    # Collection info tools
-                    elif ("collection" in tool.name.lower() or "info" in tool.name.lower()) and \
-                         any(keyword in message_lower for keyword in ["collection", "info", "status", "statistics"]):
-                        
-                        result = await session.call_tool(tool.name, {})
-                        results.append(f"[{server_name}] {tool.name}: {result.content[0].text if result.content else 'No result'}")
-                        tool_executed = True
+                # OS and system-related tools
+                elif (("os" in tool.name.lower() or "system" in tool.name.lower() or "process" in tool.name.lower()) and 
+                      any(keyword in message_lower for keyword in ["os", "operating", "system", "platform", "version", "cpu", "memory", "process", "rhel", "resource", "uptime"])):
+                    calls.append((server_name, tool.name, {}))
+                
+                # RHEL-specific tools
+                elif ("rhel" in tool.name.lower() and 
+                      any(keyword in message_lower for keyword in ["rhel", "red hat", "linux", "version", "release"])):
+                    calls.append((server_name, tool.name, {}))
+                
+                # RAG-related tools
+                elif (("rag" in tool.name.lower() or "search" in tool.name.lower() or "answer" in tool.name.lower()) and 
+                      any(keyword in message_lower for keyword in ["search", "find", "document", "rag", "knowledge", "information", "lookup", "query", "answer", "question"])):
                     
-                    # Generic system info if user asks for "everything" or "all info"
-                    elif any(phrase in message_lower for phrase in ["everything", "all info", "complete", "full", "detailed"]):
-                        result = await session.call_tool(tool.name, {})
-                        results.append(f"[{server_name}] {tool.name}: {result.content[0].text if result.content else 'No result'}")
-                        tool_executed = True
-                        
-                except Exception as e:
-                    results.append(f"[{server_name}] Error in {tool.name}: {str(e)}")
+                    # For RAG search and answer tools, pass the message as query/question
+                    if "search" in tool.name.lower():
+                        calls.append((server_name, tool.name, {"query": message}))
+                    elif "answer" in tool.name.lower():
+                        calls.append((server_name, tool.name, {"question": message}))
+                    else:
+                        calls.append((server_name, tool.name, {}))
+                
+                # Collection info tools
+                elif ("collection" in tool.name.lower() or "info" in tool.name.lower()) and \
+                     any(keyword in message_lower for keyword in ["collection", "info", "status", "statistics"]):
+                    calls.append((server_name, tool.name, {}))
+                
+                # Generic system info if user asks for "everything" or "all info"
+                elif any(phrase in message_lower for phrase in ["everything", "all info", "complete", "full", "detailed"]):
+                    calls.append((server_name, tool.name, {}))
         
+        return calls
+
+    def _tool_ttl(self, server_name: str, tool_name: str) -> float:
+        """Seconds a tool's result may be reused: config first, then the server's annotation"""
+        if tool_name in TOOL_CACHE_TTLS:
+            return TOOL_CACHE_TTLS[tool_name]
+        for tool in self.server_tools.get(server_name, []):
+            if tool.name == tool_name and tool.annotations is not None:
+                return float(getattr(tool.annotations, "cacheTtlSeconds", None) or 0)
+        return 0
+
+    def _cached_result(self, key: tuple):
+        """(text, age in seconds) of a live cache entry, or None"""
+        entry = self.tool_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, expires_at, text = entry
+        now = time.monotonic()
+        if now >= expires_at:
+            del self.tool_cache[key]
+            return None
+        self.tool_cache.move_to_end(key)
+        return text, now - stored_at
+
+    def _store_result(self, key: tuple, ttl: float, text: str):
+        now = time.monotonic()
+        self.tool_cache[key] = (now, now + ttl, text)
+        self.tool_cache.move_to_end(key)
+        while len(self.tool_cache) > TOOL_CACHE_MAX_ENTRIES:
+            self.tool_cache.popitem(last=False)
+
+    async def _call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Run one tool call under its session's concurrency limit and MCP_TOOL_TIMEOUT.
+
+        Results of tools with a TTL are reused until it expires; hits are marked
+        in the returned text.
+        """
+        ttl = self._tool_ttl(server_name, tool_name)
+        key = (server_name, tool_name, json.dumps(arguments, sort_keys=True, default=str))
+        if ttl > 0:
+            cached = self._cached_result(key)
+            if cached is not None:
+                text, age = cached
+                return f"[{server_name}] {tool_name} (cached {age:.0f}s ago): {trim_to_tokens(text, TOOL_RESULT_MAX_TOKENS)}"
+
+        session = self.sessions[server_name]
+        limit = self.session_limits.setdefault(server_name, asyncio.Semaphore(MCP_SESSION_CONCURRENCY))
+        try:
+            async with limit:
+                result = await asyncio.wait_for(session.call_tool(tool_name, arguments), MCP_TOOL_TIMEOUT)
+            text = result.content[0].text if result.content else 'No result'
+            if ttl > 0 and not result.isError:
+                self._store_result(key, ttl, text)
+            return f"[{server_name}] {tool_name}: {trim_to_tokens(text, TOOL_RESULT_MAX_TOKENS)}"
+        except asyncio.TimeoutError:
+            return f"[{server_name}] Error in {tool_name}: timed out after {MCP_TOOL_TIMEOUT}s"
+        except Exception as e:
+            return f"[{server_name}] Error in {tool_name}: {str(e)}"
+
+    async def _execute_tools(self, message: str) -> str:
+        """Execute appropriate tools from all connected servers.
+
+        Matching calls run concurrently, so this takes as long as the slowest
+        tool; results keep the server/tool order regardless of completion order.
+        """
+        calls = self._select_tool_calls(message)
+        results = await asyncio.gather(
+            *(self._call_tool(server_name, tool_name, arguments) for server_name, tool_name, arguments in calls)
+        )
         return "\n\n".join(results) if results else ""
 
 # Create MCP client instance
@@ -427,7 +760,7 @@ def create_interface():
                 connection_status = gr.Textbox(
                     label="Connection Status",
                     interactive=False,
-                    max_lines=3
+                    max_lines=10
                 )
                 
                 gr.Markdown("### Configuration")
@@ -453,33 +786,48 @@ def create_interface():
                         scale=4
                     )
                     send_btn = gr.Button("Send", variant="primary", scale=1)
+                    stop_btn = gr.Button("Stop", variant="stop", scale=1)
                 
+                generation_stats = gr.Markdown()
                 clear_btn = gr.Button("Clear History", variant="secondary")
 
         # Event handlers
+        # Reconnecting replaces every session, so never run two at once
         connect_btn.click(
             fn=mcp_client.connect,
             inputs=[server_path],
-            outputs=[connection_status]
+            outputs=[connection_status],
+            concurrency_limit=1
         )
         
-        send_btn.click(
+        send_event = send_btn.click(
             fn=mcp_client.process_message,
             inputs=[msg, chatbot],
-            outputs=[chatbot, msg]
+            outputs=[chatbot, msg, generation_stats]
         )
         
-        msg.submit(
+        submit_event = msg.submit(
             fn=mcp_client.process_message,
             inputs=[msg, chatbot],
-            outputs=[chatbot, msg]
+            outputs=[chatbot, msg, generation_stats]
+        )
+        
+        # Stop cancels the Ollama stream on the event loop, which closes it
+        # mid-generation; the partial reply stays
+        stop_btn.click(
+            fn=mcp_client.stop_generation,
+            cancels=[send_event, submit_event],
+            queue=False
         )
         
         clear_btn.click(
-            fn=lambda: ([], ""),
-            outputs=[chatbot, msg]
+            fn=lambda: ([], "", ""),
+            outputs=[chatbot, msg, generation_stats]
         )
 
+    # Gradio runs one event at a time per handler by default; allow parallel chats
+    demo.queue(default_concurrency_limit=GRADIO_CONCURRENCY, max_size=GRADIO_QUEUE_SIZE)
+
     return demo
 
 if __name__ == "__main__":
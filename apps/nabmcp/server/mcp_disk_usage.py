@@ -5,22 +5,15 @@ MCP server for disk usage information
 
 import shutil
 import os
+import functools
+import anyio
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 
 # Initialize FastMCP server
 mcp = FastMCP("disk-usage-server")
 
-@mcp.tool()
-def get_disk_usage(path: str = "/") -> str:
-    """
-    Get disk usage information for the specified path.
-    
-    Args:
-        path (str): Path to check (default: "/")
-    
-    Returns:
-        str: Disk usage information
-    """
+def _get_disk_usage(path: str = "/") -> str:
     try:
         # Get disk usage
         total, used, free = shutil.disk_usage(path)
@@ -45,14 +38,21 @@ def get_disk_usage(path: str = "/") -> str:
     except Exception as e:
         return f"Error: Failed to get disk usage information: {str(e)}"
 
-@mcp.tool()
-def get_multiple_disk_usage() -> str:
+# cacheTtlSeconds: how long clients may reuse a tool's result (see nabmcp app.py)
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, cacheTtlSeconds=30))
+async def get_disk_usage(path: str = "/") -> str:
     """
-    Get disk usage information for multiple major paths (/, /tmp, /home, etc.).
+    Get disk usage information for the specified path.
+    
+    Args:
+        path (str): Path to check (default: "/")
     
     Returns:
-        str: Multiple paths disk usage information
+        str: Disk usage information
     """
+    return await anyio.to_thread.run_sync(functools.partial(_get_disk_usage, path=path))
+
+def _get_multiple_disk_usage() -> str:
     paths_to_check = ["/", "/tmp", "/home", "/var"]
     results = []
     
@@ -76,18 +76,17 @@ Path       | Total     | Used      | Free      | Usage%
     
     return header + "\n" + "\n".join(results) + "\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 
-@mcp.tool()
-def check_disk_space_warning(path: str = "/", threshold: float = 80.0) -> str:
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, cacheTtlSeconds=30))
+async def get_multiple_disk_usage() -> str:
     """
-    Check if disk usage exceeds the threshold.
-    
-    Args:
-        path (str): Path to check (default: "/")
-        threshold (float): Usage percentage threshold for warning (default: 80.0%)
+    Get disk usage information for multiple major paths (/, /tmp, /home, etc.).
     
     Returns:
-        str: Warning information
+        str: Multiple paths disk usage information
     """
+    return await anyio.to_thread.run_sync(_get_multiple_disk_usage)
+
+def _check_disk_space_warning(path: str = "/", threshold: float = 80.0) -> str:
     try:
         total, used, free = shutil.disk_usage(path)
         usage_percent = (used / total) * 100
@@ -110,6 +109,20 @@ Threshold: {threshold}%"""
     except Exception as e:
         return f"Error: Failed to check disk usage: {str(e)}"
 
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, cacheTtlSeconds=30))
+async def check_disk_space_warning(path: str = "/", threshold: float = 80.0) -> str:
+    """
+    Check if disk usage exceeds the threshold.
+    
+    Args:
+        path (str): Path to check (default: "/")
+        threshold (float): Usage percentage threshold for warning (default: 80.0%)
+    
+    Returns:
+        str: Warning information
+    """
+    return await anyio.to_thread.run_sync(functools.partial(_check_disk_space_warning, path=path, threshold=threshold))
+
 if __name__ == "__main__":
     # Start MCP server
     mcp.run()
\ No newline at end of file
@@ -8,19 +8,15 @@ import os
 import subprocess
 import psutil
 from datetime import datetime
+import functools
+import anyio
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 
 # Initialize FastMCP server
 mcp = FastMCP("os-info-server")
 
-@mcp.tool()
-def get_os_name() -> str:
-    """
-    Get basic operating system information.
-    
-    Returns:
-        str: OS name and basic information
-    """
+def _get_os_name() -> str:
     try:
         os_info = f"""Operating System Information
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -39,14 +35,19 @@ def get_os_name() -> str:
     except Exception as e:
         return f"Error: Failed to get OS information: {str(e)}"
 
-@mcp.tool()
-def get_system_resources() -> str:
+# cacheTtlSeconds: how long clients may reuse a tool's result (see nabmcp app.py)
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, cacheTtlSeconds=3600))
+async def get_os_name() -> str:
     """
-    Get system resource usage (CPU, Memory).
+    Get basic operating system information.
     
     Returns:
-        str: System resource information
+        str: OS name and basic information
     """
+    # Blocking bodies run in a worker thread so concurrent calls don't queue on the event loop
+    return await anyio.to_thread.run_sync(_get_os_name)
+
+def _get_system_resources() -> str:
     try:
         # CPU information
         cpu_percent = psutil.cpu_percent(interval=1)
@@ -94,14 +95,17 @@ def get_system_resources() -> str:
     except Exception as e:
         return f"Error: Failed to get system resource information: {str(e)}"
 
-@mcp.tool()
-def get_rhel_version() -> str:
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, cacheTtlSeconds=10))
+async def get_system_resources() -> str:
     """
-    Get RHEL (Red Hat Enterprise Linux) version information.
+    Get system resource usage (CPU, Memory).
     
     Returns:
-        str: RHEL version information
+        str: System resource information
     """
+    return await anyio.to_thread.run_sync(_get_system_resources)
+
+def _get_rhel_version() -> str:
     try:
         rhel_info = []
         
@@ -145,17 +149,17 @@ def get_rhel_version() -> str:
     except Exception as e:
         return f"Error: Failed to get RHEL information: {str(e)}"
 
-@mcp.tool()
-def get_process_info(limit: int = 10) -> str:
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, cacheTtlSeconds=3600))
+async def get_rhel_version() -> str:
     """
-    Get information about running processes.
-    
-    Args:
-        limit (int): Number of processes to display (default: 10)
+    Get RHEL (Red Hat Enterprise Linux) version information.
     
     Returns:
-        str: Process information
+        str: RHEL version information
     """
+    return await anyio.to_thread.run_sync(_get_rhel_version)
+
+def _get_process_info(limit: int = 10) -> str:
     try:
         processes = []
         
@@ -189,6 +193,19 @@ PID     | Process Name          | CPU%  | MEM%  | User
     except Exception as e:
         return f"Error: Failed to get process information: {str(e)}"
 
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, cacheTtlSeconds=10))
+async def get_process_info(limit: int = 10) -> str:
+    """
+    Get information about running processes.
+    
+    Args:
+        limit (int): Number of processes to display (default: 10)
+    
+    Returns:
+        str: Process information
+    """
+    return await anyio.to_thread.run_sync(functools.partial(_get_process_info, limit=limit))
+
 if __name__ == "__main__":
     # Start MCP server
     mcp.run()
\ No newline at end of file
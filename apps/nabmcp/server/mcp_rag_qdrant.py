@@ -9,6 +9,8 @@ import hashlib
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import requests
+import functools
+import anyio
 from mcp.server.fastmcp import FastMCP
 
 # Qdrant configuration
@@ -184,20 +186,7 @@ class QdrantRAGClient:
 # Initialize RAG client
 rag_client = QdrantRAGClient()
 
-@mcp.tool()
-def add_text_document(text: str, title: str = "", source: str = "", tags: str = "") -> str:
-    """
-    Add a text document to the RAG collection.
-    
-    Args:
-        text (str): The text content to add
-        title (str): Optional title for the document
-        source (str): Optional source information
-        tags (str): Optional comma-separated tags
-    
-    Returns:
-        str: Success or error message
-    """
+def _add_text_document(text: str, title: str = "", source: str = "", tags: str = "") -> str:
     try:
         if not text.strip():
             return "❌ Error: Text content cannot be empty."
@@ -231,18 +220,22 @@ def add_text_document(text: str, title: str = "", source: str = "", tags: str =
         return f"❌ Error adding document: {str(e)}"
 
 @mcp.tool()
-def search_rag_documents(query: str, limit: int = 5, min_score: float = 0.5) -> str:
+async def add_text_document(text: str, title: str = "", source: str = "", tags: str = "") -> str:
     """
-    Search for relevant documents in the RAG collection.
+    Add a text document to the RAG collection.
     
     Args:
-        query (str): Search query
-        limit (int): Maximum number of results to return (default: 5)
-        min_score (float): Minimum similarity score (0.0-1.0, default: 0.5)
+        text (str): The text content to add
+        title (str): Optional title for the document
+        source (str): Optional source information
+        tags (str): Optional comma-separated tags
     
     Returns:
-        str: Search results
+        str: Success or error message
     """
+    return await anyio.to_thread.run_sync(functools.partial(_add_text_document, text=text, title=title, source=source, tags=tags))
+
+def _search_rag_documents(query: str, limit: int = 5, min_score: float = 0.5) -> str:
     try:
         if not query.strip():
             return "❌ Error: Search query cannot be empty."
@@ -288,13 +281,21 @@ Content:
         return f"❌ Error searching documents: {str(e)}"
 
 @mcp.tool()
-def get_rag_collection_info() -> str:
+async def search_rag_documents(query: str, limit: int = 5, min_score: float = 0.5) -> str:
     """
-    Get information about the RAG collection.
+    Search for relevant documents in the RAG collection.
+    
+    Args:
+        query (str): Search query
+        limit (int): Maximum number of results to return (default: 5)
+        min_score (float): Minimum similarity score (0.0-1.0, default: 0.5)
     
     Returns:
-        str: Collection information
+        str: Search results
     """
+    return await anyio.to_thread.run_sync(functools.partial(_search_rag_documents, query=query, limit=limit, min_score=min_score))
+
+def _get_rag_collection_info() -> str:
     try:
         info = rag_client.get_collection_info()
         
@@ -321,19 +322,16 @@ def get_rag_collection_info() -> str:
         return f"❌ Error getting collection info: {str(e)}"
 
 @mcp.tool()
-def answer_with_rag(question: str, search_limit: int = 3, min_score: float = 0.6) -> str:
+async def get_rag_collection_info() -> str:
     """
-    Answer a question using RAG (Retrieval Augmented Generation).
-    This tool searches for relevant documents and uses them to provide context for answering.
-    
-    Args:
-        question (str): The question to answer
-        search_limit (int): Number of documents to retrieve for context (default: 3)
-        min_score (float): Minimum similarity score for retrieved documents (default: 0.6)
+    Get information about the RAG collection.
     
     Returns:
-        str: Answer based on retrieved documents
+        str: Collection information
     """
+    return await anyio.to_thread.run_sync(_get_rag_collection_info)
+
+def _answer_with_rag(question: str, search_limit: int = 3, min_score: float = 0.6) -> str:
     try:
         if not question.strip():
             return "❌ Error: Question cannot be empty."
@@ -377,6 +375,22 @@ Try:
     except Exception as e:
         return f"❌ Error in RAG answering: {str(e)}"
 
+@mcp.tool()
+async def answer_with_rag(question: str, search_limit: int = 3, min_score: float = 0.6) -> str:
+    """
+    Answer a question using RAG (Retrieval Augmented Generation).
+    This tool searches for relevant documents and uses them to provide context for answering.
+    
+    Args:
+        question (str): The question to answer
+        search_limit (int): Number of documents to retrieve for context (default: 3)
+        min_score (float): Minimum similarity score for retrieved documents (default: 0.6)
+    
+    Returns:
+        str: Answer based on retrieved documents
+    """
+    return await anyio.to_thread.run_sync(functools.partial(_answer_with_rag, question=question, search_limit=search_limit, min_score=min_score))
+
 if __name__ == "__main__":
     # Test connection on startup
     try: